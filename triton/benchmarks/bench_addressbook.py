@@ -0,0 +1,133 @@
+"""AddressBook operations at scale, emitted as JSON.
+
+Run: python benchmarks/bench_addressbook.py [--sizes 1000 10000 ...] [--repeat 3] [--output results.json]
+                                            [--compare previous.json]
+"""
+import argparse
+from contextlib import redirect_stdout
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import GeneratorType
+
+triton_path = Path(__file__).parent.parent / 'triton'
+sys.path.append(str(triton_path))
+
+from contact_book_classes import AddressBook, declare_view_format
+from generator import build_book
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SEARCH_QUERIES = ['an', 'Olena1', '+38050', 'mail.co', 'Kyiv']
+
+
+def timed(func, repeat):
+    # Найкращий час з repeat запусків. Вивід команд (повідомлення, таблиці) відкидається,
+    # а результат-генератор сторінок прогортається до кінця, щоб врахувати рендеринг усіх сторінок.
+    best = None
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = func()
+            if isinstance(result, GeneratorType):
+                for _ in result:
+                    pass
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_storage(book, suffix, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        filename = str(Path(folder) / f'contact_book{suffix}')
+        results['save_to_file'] = timed(lambda: AddressBook(book.data).save_to_file(filename), 1)
+        results['load_from_file'] = timed(lambda: AddressBook().load_from_file(filename), repeat)
+
+        def load_all():
+            loaded = AddressBook()
+            loaded.load_from_file(filename)
+            for _ in loaded.data.values():
+                pass
+            loaded.storage.close()
+
+        results['load_from_file_and_read_all'] = timed(load_all, repeat)
+    return results
+
+
+def bench_size(size, repeat):
+    book = build_book(size)
+    results = {}
+    for suffix in ('.bin', '.db'):
+        for name, seconds in bench_storage(book, suffix, repeat).items():
+            results[f'{name}[{suffix}]'] = seconds
+    results['search_match[first]'] = timed(lambda: book.search_match(SEARCH_QUERIES[0]), 1)
+    for query in SEARCH_QUERIES:
+        results[f'search_match[{query}]'] = timed(lambda: book.search_match(query), repeat)
+    results['congrats_list[30]'] = timed(lambda: book.congrats_list(30), repeat)
+    results['next_week_birthdays'] = timed(book.next_week_birthdays, repeat)
+    results['current_week_birthdays'] = timed(book.current_week_birthdays, repeat)
+    results['next_month_birthdays'] = timed(book.next_month_birthdays, repeat)
+    results['current_month_birthdays'] = timed(book.current_month_birthdays, repeat)
+    results['sort_by_name'] = timed(book.sort_by_name, repeat)
+    results['sort_by_age'] = timed(book.sort_by_age, repeat)
+    results['sort_by_age[limit=10]'] = timed(lambda: book.sort_by_age(limit=10), repeat)
+    results['get_all_contacts'] = timed(book.get_all_contacts, repeat)
+    return results
+
+
+def version():
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=triton_path, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, previous):
+    # Відношення нового часу до попереднього: більше 1 означає, що операція стала повільнішою.
+    for size, results in current['results'].items():
+        old_results = previous['results'].get(size, {})
+        for name, seconds in results.items():
+            old = old_results.get(name)
+            if old:
+                print(f'{size:>9} {name:<45} {old:10.5f} -> {seconds:10.5f} s  x{seconds / old:.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='file for JSON results (stdout if omitted)')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare with')
+    args = parser.parse_args()
+
+    declare_view_format(1)
+    report = {
+        'version': version(),
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'results': {},
+    }
+    for size in args.sizes:
+        report['results'][str(size)] = bench_size(size, args.repeat)
+        print(f'{size} contacts done', file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.write(output)
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as fh:
+            compare(report, json.load(fh))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Per-validation cost of Country before and after the preloaded country index.
+
+Run: python benchmarks/bench_country.py
+"""
+import sys
+from pathlib import Path
+from timeit import timeit
+
+triton_path = Path(__file__).parent.parent / 'triton'
+sys.path.append(str(triton_path))
+
+from contact_book_classes import Country
+from contact_book_validation import countries_txt, countries_index
+
+SAMPLES = ['ukraine', 'Zimbabwe', 'united states', 'afghanistan', 'Poland']
+NUMBER = 2000
+
+
+def linear_scan_country(value):
+    # Попередня реалізація Country.value: повне читання countries.txt на кожну перевірку.
+    with open(countries_txt, 'r') as fh:
+        readlines = fh.readlines()
+        for line in readlines:
+            if value.lower() == 'russia':
+                return 'a terrorist country'
+            elif value.lower() == line.lower().strip():
+                lst_value = value.lower().strip().split(' ')
+                return ' '.join(i.capitalize() for i in lst_value)
+        raise ValueError
+
+
+def per_call_us(func):
+    total = timeit(lambda: [func(value) for value in SAMPLES], number=NUMBER)
+    return total / (NUMBER * len(SAMPLES)) * 1e6
+
+
+def main():
+    countries_index()  # індекс будується один раз, під час першої перевірки
+    before = per_call_us(linear_scan_country)
+    after = per_call_us(Country)
+    print(f'linear scan of countries.txt: {before:8.2f} us per validation')
+    print(f'preloaded country index:      {after:8.2f} us per validation')
+    print(f'speedup: x{before / after:.1f}')
+
+
+if __name__ == '__main__':
+    main()
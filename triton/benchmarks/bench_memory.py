@@ -0,0 +1,33 @@
+"""Bytes per contact of an in-memory AddressBook.
+
+Run: python benchmarks/bench_memory.py [sizes...]   (default: 100000 1000000)
+"""
+import sys
+import tracemalloc
+from pathlib import Path
+
+triton_path = Path(__file__).parent.parent / 'triton'
+sys.path.append(str(triton_path))
+
+from contact_book_classes import declare_view_format
+from generator import build_book
+
+
+def bytes_per_contact(size):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    book = build_book(size)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(book)
+
+
+def main():
+    declare_view_format(1)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for size in sizes:
+        print(f'{size:>9} contacts: {bytes_per_contact(size):8.1f} bytes per contact')
+
+
+if __name__ == '__main__':
+    main()
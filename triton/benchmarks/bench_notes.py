@@ -0,0 +1,104 @@
+"""Notebook operations at scale: loading, saving, searching and paging synthetic notebooks.
+
+Run: python benchmarks/bench_notes.py [--sizes 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+from contextlib import redirect_stdout
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+triton_path = Path(__file__).parent.parent / 'triton'
+sys.path.append(str(triton_path))
+
+from generator import build_notebook
+from notes_class import Notebook
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+QUERIES = [('content', 'meeting'), ('content', 'python'), ('content', 'pyth rev'), ('content', 'garden ticket doctor'),
+           ('name', 'book 12'), ('tags', 'urg')]
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def linear_search(notebook, field, search):
+    # Попередня реалізація search_in_notes: кожен пошук переводить текст усіх нотаток у нижній регістр.
+    result = []
+    for note in notebook.data.values():
+        if str(search).lower() in str(getattr(note, field)).lower():
+            result.append(note)
+    return result
+
+
+def legacy_save(notebook, filename):
+    # Попередній save_json: увесь блокнот з відступами при кожному збереженні.
+    data = {'tags': notebook.tags_list, 'notes': [Notebook.note_row(note) for note in notebook.data.values()]}
+    with open(filename, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+
+
+def legacy_page(notes, n, number):
+    # Попередні Notebook.iterator і show_comand: щоб дійти до сторінки number, форматуються всі попередні сторінки.
+    count, page, current = 0, "", 0
+    for note in notes:
+        page += (str(note)) + "\n"
+        count += 1
+        if count >= n:
+            current += 1
+            if current == number:
+                return page
+            count, page = 0, ""
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        notebook = build_notebook(size)
+        with tempfile.TemporaryDirectory() as folder:
+            filename = str(Path(folder) / 'notebook.json')
+            notebook.save_json(filename)
+            load = timed(lambda: Notebook().load_json(filename), args.repeat)
+            full = timed(lambda: legacy_save(notebook, str(Path(folder) / 'legacy.json')), args.repeat)
+            # Далі - блокнот, завантажений з файлу: вміст нотаток читається з диска лише під час показу і пошуку.
+            opened = Notebook()
+            opened.load_json(filename)
+            note = next(iter(opened.data.values()))
+            change = timed(lambda: opened.edit_status_in_note(note), args.repeat)  # один рядок у журналі
+            print(f'{size:>9} notes: load_json {load * 1000:9.1f} ms, saving one change: whole file '
+                  f'{full * 1000:9.1f} ms, journal {change * 1000:6.3f} ms')
+            for field, query in QUERIES:
+                before = timed(lambda: linear_search(opened, field, query), args.repeat)
+                first = timed(lambda: opened.search_in_notes(field, query), 1)  # перший пошук у полі будує індекс
+                after = timed(lambda: opened.search_in_notes(field, query), args.repeat)
+                found = len(opened.search_in_notes(field, query))
+                print(f'{"":>16}{field:>8} {query!r:<24} linear {before * 1000:8.2f} ms, index {after * 1000:8.2f} ms '
+                      f'(first search {first * 1000:8.2f} ms), {found} found')
+            both = timed(lambda: opened.notes_with_tags('work', 'urgent'), args.repeat)
+            print(f'{"":>16}notes with tags work and urgent: {both * 1000:8.2f} ms, '
+                  f'{len(opened.notes_with_tags("work", "urgent"))} found')
+            number = min(500, len(opened.pages(opened.values(), 7)))
+            before = timed(lambda: legacy_page(opened.values(), 7, number), args.repeat)
+            after = timed(lambda: opened.pages(opened.values(), 7).go(number), args.repeat)
+            print(f'{"":>16}page {number} of 7 notes: rendering from the start {before * 1000:8.2f} ms, '
+                  f'NotePages {after * 1000:8.2f} ms')
+            opened.save_json(filename)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""End-to-end time of a recorded TRITON session replayed against synthetic contact books and notebooks.
+
+Run: python benchmarks/bench_session.py [--sizes 1000 10000] [--session recorded.jsonl] [--output results.json]
+Without --session a built-in session is replayed: contact book listings, search, sorting and birthdays, then a notebook search.
+Record your own with: starttriton --record session.jsonl
+"""
+import argparse
+from contextlib import redirect_stdout
+import io
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+triton_path = Path(__file__).parent.parent / 'triton'
+sys.path.append(str(triton_path))
+
+from generator import build_book, build_notebook
+
+DEFAULT_SIZES = [1_000, 10_000]
+# Відповіді в порядку запитань. 'q' зупиняє пейджер після першої сторінки (списки більші за 50 контактів).
+SESSION = [
+    '1', '1',
+    'show all', 'q',
+    'search', 'Kyiv', 'q',
+    'sort by age 10',
+    'sort by name 10 100',
+    'next month birthdays', 'q',
+    'exit',
+    '1', '2',
+    '3', '2', 'python', '1', '3',
+    '5',
+    '1', '0', 'y',
+]
+
+
+def prepare(folder, size):
+    book = build_book(size)
+    with redirect_stdout(io.StringIO()):
+        book.save_to_file(str(Path(folder) / 'contact_book.db'))
+    book.storage.close()
+    build_notebook(size).save_json(str(Path(folder) / 'notebook.json'))
+
+
+def replay(folder, session_path):
+    # Кожен сеанс - окремий процес, як і справжній запуск: у час входить і завантаження книги з диска.
+    report_path = Path(folder) / 'report.json'
+    subprocess.run(
+        [sys.executable, str(triton_path / 'triton.py'), '--workdir', folder, '--replay', session_path,
+         '--report', str(report_path)],
+        check=False, stdout=subprocess.DEVNULL,
+    )
+    with open(report_path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--session', help='session recorded with starttriton --record')
+    parser.add_argument('--output', help='write the reports as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            prepare(folder, size)
+            session_path = args.session and str(Path(args.session).resolve())
+            if session_path is None:
+                session_path = str(Path(folder) / 'session.jsonl')
+                with open(session_path, 'w', encoding='utf-8') as fh:
+                    fh.writelines(json.dumps({'prompt': '', 'answer': answer}) + '\n' for answer in SESSION)
+            report = results[size] = replay(folder, session_path)
+        slowest = max(report['steps'], key=lambda step: step['seconds'])
+        print(f"{size:>9} contacts/notes: total {report['total_seconds'] * 1000:9.1f} ms, "
+              f"p50 {report['p50'] * 1000:7.2f} ms, max {report['max'] * 1000:8.1f} ms "
+              f"(after {slowest['answer']!r}), finished: {'yes' if report['completed'] else 'no'}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
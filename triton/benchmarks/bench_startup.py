@@ -0,0 +1,60 @@
+"""Startup import time of TRITON modules, measured with python -X importtime.
+
+Run: python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 50]
+Exit code is 1 if the main menu (module triton) imports slower than the budget or if rich is loaded before it is needed.
+"""
+import argparse
+import compileall
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+triton_path = Path(__file__).parent.parent / 'triton'
+
+# Модулі в порядку запуску: головне меню, далі розділи, які імпортуються лише після вибору в меню.
+MODULES = ['triton', 'contact_book_main', 'notes_main', 'sort_folder']
+BUDGET_MS = 50
+
+
+def import_time(module):
+    # Повертає (загальний час імпорту модуля в мс, множина всіх імпортованих модулів).
+    code = f'import sys; sys.path.insert(0, {str(triton_path)!r}); import {module}'
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True).stderr
+    total, imported = None, set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue  # заголовок таблиці
+        imported.add(name.strip())
+        if name.strip() == module:
+            total = int(cumulative) / 1000
+    return total, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    args = parser.parse_args()
+
+    # Без скомпільованого байткоду вимірювався б час компіляції, а не імпорту (наприклад, з PYTHONDONTWRITEBYTECODE).
+    compileall.compile_dir(str(triton_path), quiet=1)
+    ok = True
+    for module in MODULES:
+        runs = [import_time(module) for _ in range(args.repeat)]
+        median = statistics.median(total for total, _ in runs)
+        rich_loaded = 'rich' in runs[0][1]
+        print(f'{module:<20} {median:8.2f} ms   rich loaded: {"yes" if rich_loaded else "no"}')
+        if module in ('triton', 'contact_book_main') and rich_loaded:
+            ok = False
+        if module == 'triton' and median > args.budget_ms:
+            ok = False
+    print(f'main menu budget: {args.budget_ms:.0f} ms -> {"ok" if ok else "FAILED"}')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Cost of suggesting a command for a typo: difflib over HANDLERS versus the prebuilt CommandSuggester.
+
+Run: python benchmarks/bench_suggest.py
+"""
+import difflib
+import sys
+from pathlib import Path
+from timeit import timeit
+
+triton_path = Path(__file__).parent.parent / 'triton'
+sys.path.append(str(triton_path))
+
+from contact_book_functions import HANDLERS, SUGGESTER
+
+TYPOS = ['shwo all', 'hepl', 'exti', 'add phon', 'sort by nmae', 'curent month', 'delet user', 'serch',
+         'chnage city', 'ірщц фдж', 'xyz', 'nxet week birthdays']
+NUMBER = 500
+
+
+def difflib_suggest(command):
+    # Попередня реалізація unknown_command: список ключових слів збирається заново на кожну помилку.
+    possibilities = []
+    for commands in HANDLERS.values():
+        possibilities.extend([i for i in commands])
+    return difflib.get_close_matches(command, possibilities, 3, 0.7)
+
+
+def per_call_us(func):
+    total = timeit(lambda: [func(typo) for typo in TYPOS], number=NUMBER)
+    return total / (NUMBER * len(TYPOS)) * 1e6
+
+
+def main():
+    keywords = sum(len(keywords) for keywords in HANDLERS.values())
+    for typo in TYPOS:
+        print(f'{typo!r:>24}: difflib {difflib_suggest(typo)}, suggester {[k for k, _ in SUGGESTER.suggest(typo)]}')
+    before = per_call_us(difflib_suggest)
+    after = per_call_us(SUGGESTER.suggest)
+    print(f'\n{keywords} command keywords')
+    print(f'difflib.get_close_matches: {before:8.2f} us per typo')
+    print(f'CommandSuggester:          {after:8.2f} us per typo')
+    print(f'speedup: x{before / after:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Synthetic contacts and notes for benchmarks."""
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+triton_path = Path(__file__).parent.parent / 'triton'
+sys.path.append(str(triton_path))
+
+from contact_book_classes import (
+    AddressBook, Record, Name, Phone, Birthday, Email, Country, City, Street, House
+)
+from contact_book_validation import countries_index
+from notes_class import Notebook, Note, Field, Tag
+
+FIRST_NAMES = ['Olena', 'Andrii', 'Iryna', 'Taras', 'Oksana', 'Dmytro', 'Maria', 'Serhii', 'Nataliia', 'Oleh',
+               'Anna', 'Yurii', 'Kateryna', 'Bohdan', 'Sofiia', 'Ivan', 'John', 'Emma', 'Lukas', 'Zofia']
+CITIES = ['Kyiv', 'Lviv', 'Odesa', 'Dnipro', 'Kharkiv', 'Poltava', 'Warsaw', 'Berlin', 'Paris', 'Toronto']
+STREETS = ['Main', 'Shevchenka', 'Franka', 'Central', 'Green', 'Park', 'Khreshchatyk', 'Sadova']
+WORDS = ['meeting', 'call', 'buy', 'milk', 'report', 'deadline', 'project', 'idea', 'book', 'travel', 'doctor',
+         'birthday', 'gift', 'python', 'review', 'budget', 'plan', 'week', 'friday', 'train', 'ticket', 'garden']
+TAGS = ['work', 'home', 'shopping', 'ideas', 'health', 'travel', 'family', 'study', 'urgent', 'later']
+
+
+def synthetic_rows(size, seed=0):
+    # Рядки у форматі імпорту (contact_book_import): усі значення проходять перевірку полів.
+    rnd = random.Random(seed)
+    countries = list(countries_index())
+    first_birthday = date(1940, 1, 1)
+    for i in range(size):
+        name = f'{rnd.choice(FIRST_NAMES)}{i}'
+        birthday = first_birthday + timedelta(days=rnd.randrange(365 * 65))
+        yield {
+            'name': name,
+            'phones': ';'.join(f'+380{rnd.randrange(10 ** 9):09d}' for _ in range(rnd.randint(1, 2))),
+            'birthday': birthday.strftime('%d.%m.%Y') if rnd.random() < 0.9 else '',
+            'email': f'{name.lower()}@mail.com' if rnd.random() < 0.7 else '',
+            'country': rnd.choice(countries),
+            'city': rnd.choice(CITIES),
+            'street': rnd.choice(STREETS),
+            'house': str(rnd.randint(1, 200)),
+        }
+
+
+def synthetic_records(size, seed=0):
+    # Записи будуються з уже коректних значень, тому поля створюються без повторної валідації.
+    index = countries_index()
+    for row in synthetic_rows(size, seed):
+        record = Record(Name.restore(row['name']))
+        record.phones = [Phone.restore(phone) for phone in row['phones'].split(';')]
+        if row['birthday']:
+            day, month, year = row['birthday'].split('.')
+            record.birthday = Birthday.restore(date(int(year), int(month), int(day)))
+        if row['email']:
+            record.email = Email.restore(row['email'])
+        record.country = Country.restore(index[row['country']])
+        record.city = City.restore(row['city'])
+        record.street = Street.restore(row['street'])
+        record.house = House.restore(row['house'])
+        yield record
+
+
+def build_book(size, seed=0):
+    book = AddressBook()
+    book.add_records(synthetic_records(size, seed))
+    return book
+
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ter', 'zan', 'po', 'ri', 'vel', 'su', 'dan', 'ko', 'ma', 'nir', 'to', 'ly', 'bra']
+
+
+def vocabulary(size, seed=0):
+    # WORDS і ще size вигаданих слів. Слова вибираються з імовірністю 1/ранг (закон Ціпфа), як у звичайному тексті:
+    # кілька слів є майже в кожній нотатці, а більшість - лише в небагатьох.
+    rnd = random.Random(seed)
+    words = list(WORDS)
+    known = set(words)
+    while len(words) < len(WORDS) + size:
+        word = ''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+        if word not in known:
+            known.add(word)
+            words.append(word)
+    weights, total = [], 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1 / rank
+        weights.append(total)
+    return words, weights
+
+
+def build_notebook(size, seed=0):
+    # Нотатки з 5-40 слів і 0-3 тегами; список тегів блокнота містить усі використані теги.
+    rnd = random.Random(seed)
+    words, weights = vocabulary(20_000, seed)
+    notebook = Notebook()
+    for i in range(size):
+        content = ' '.join(rnd.choices(words, cum_weights=weights, k=rnd.randint(5, 40)))
+        note = Note(Field(f'{rnd.choice(WORDS)} {i}'), Field(content))
+        for tag in rnd.sample(TAGS, rnd.randint(0, 3)):
+            note.add_tag_in_tags(Tag(tag))
+        notebook.add_note(note)
+    notebook.tags_list = list(TAGS)
+    return notebook
@@ -6,7 +6,8 @@ setup(name='triton',
       url='https://github.com/tru-ten/Personal_assistant',
       author='team_6th.py',
       license='MIT',
-      packages=find_namespace_packages(),
+      packages=find_namespace_packages(exclude=['benchmarks*']),
       include_package_data=True,
+      extras_require={'analytics': ['numpy']},
       entry_points = {'console_scripts': 'starttriton = triton.triton:main'}
       )
\ No newline at end of file
@@ -0,0 +1,83 @@
+from datetime import date
+
+
+def load_numpy():
+    # NumPy - необов'язкова залежність (pip install triton[analytics]). Без неї книга працює через звичайні індекси.
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class BirthdayColumns:
+    """Birth dates of the whole book as one datetime64[D] column"""
+
+    # Будується з пар (ім'я, дата народження), відсортованих за ім'ям, тому записи читати не потрібно: у SQLite це один
+    # запит до колонки birthday. Дні до наступного дня народження, вік та належність до вікна дат рахуються для всієї книги
+    # однією векторною операцією. Записи читаються через lookup лише для знайдених імен.
+    # Результати збігаються з BirthdayIndex, BirthdateIndex та Record.days_to_birthday_int_numbers: ті, хто народився
+    # 29 лютого, у невисокосні роки святкують 28 лютого, а записи з однаковим ключем впорядковані за ім'ям.
+
+    def __init__(self, pairs, numpy, lookup):
+        np = self.np = numpy
+        self.lookup = lookup
+        self.names = []
+        dates = []
+        for name, birthday in pairs:
+            self.names.append(name)
+            dates.append(birthday)
+        self.dates = np.array(dates, dtype='datetime64[D]')
+        months = self.dates.astype('datetime64[M]')
+        self.month = months.astype(int) % 12 + 1
+        self.day = (self.dates - months.astype('datetime64[D]')).astype(int) + 1
+        self.leap_day = (self.month == 2) & (self.day == 29)
+        self._oldest = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def celebrations(self, year: int):
+        # Дати святкування у заданому році для всіх записів.
+        np = self.np
+        leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        day = self.day if leap else np.where(self.leap_day, 28, self.day)
+        months = np.datetime64(f'{year:04d}-01', 'M') + (self.month - 1)
+        return months.astype('datetime64[D]') + (day - 1)
+
+    def days_until(self, today: date):
+        # Кількість днів до найближчого дня народження (0 - сьогодні) для кожного запису.
+        np = self.np
+        now = np.datetime64(today, 'D')
+        days = (self.celebrations(today.year) - now).astype(int)
+        next_year = (self.celebrations(today.year + 1) - now).astype(int)
+        return np.where(days < 0, next_year, days)
+
+    def ages_in_days(self, today: date):
+        return (self.np.datetime64(today, 'D') - self.dates).astype(int)
+
+    def _records(self, positions) -> list:
+        return [self.lookup(self.names[position]) for position in positions.tolist()]
+
+    def _ordered(self, mask, keys):
+        # Позиції, що пройшли mask, впорядковані за keys. Стабільне сортування зберігає порядок за ім'ям для однакових ключів.
+        np = self.np
+        positions = np.flatnonzero(mask)
+        return positions[np.argsort(keys[positions], kind='stable')]
+
+    def window(self, today: date, first: int, last: int) -> list:
+        # Те саме, що BirthdayIndex.window: записи, до дня народження яких від first до last днів, у порядку наближення дат.
+        days = self.days_until(today)
+        return self._records(self._ordered((days >= max(first, 0)) & (days <= min(last, 366)), days))
+
+    def in_month(self, month: int) -> list:
+        return self._records(self._ordered(self.month == month, self.day))
+
+    def walk(self, offset: int = 0, limit: int = None, reverse: bool = False):
+        # Те саме, що BirthdateIndex.walk: від найстаршого до наймолодшого (або навпаки), записи читаються по одному.
+        if self._oldest is None:
+            self._oldest = self.np.argsort(self.dates, kind='stable')
+        positions = self._oldest[::-1] if reverse else self._oldest
+        stop = offset + limit if limit is not None else None
+        for position in positions[offset:stop].tolist():
+            yield self.lookup(self.names[position])
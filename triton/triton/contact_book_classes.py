@@ -1,17 +1,26 @@
 import sys
-from pathlib import Path
 
 from abc import ABC, abstractmethod
-from collections import UserDict, defaultdict
+from collections import UserDict
 from datetime import datetime
-import pickle  # модуль для зберігання та читання інформації.
+from itertools import islice
 import re
 
-from rich.table import Table
 from termcolor import colored
 
-triton_path = Path(__file__).parent.parent
-countries_txt = triton_path / 'countries.txt'
+from contact_book_indexes import BirthdayIndex, NgramIndex, PhoneIndex, NameIndex, BirthdateIndex, birthday_in_year
+from contact_book_analytics import BirthdayColumns, load_numpy
+from contact_book_validation import (
+    country_completions,
+    validate_name,
+    validate_phone,
+    validate_birthday,
+    validate_email,
+    validate_country,
+    validate_city,
+    validate_street,
+    validate_house
+)
 
 class ConsoleView(ABC):
 
@@ -33,11 +42,20 @@ class ConsoleView(ABC):
     def view_some_info(self):
         pass
 
+    def iter_users_info(self, data, page_size: int):
+        # Рендерить дані сторінками по page_size рядків у міру того, як їх читають з ітератора data.
+        data = iter(data)
+        while True:
+            page = list(islice(data, page_size))
+            if not page:
+                return
+            yield self.view_users_info(page)
+
 
 class RecordStrView(ConsoleView):
 
     def view_users_info(self, data):
-        result = ''
+        result = []
         for contact in data:
             info = colored(f"User: {contact[0]} \
 | phones: {contact[1]} \
@@ -47,8 +65,8 @@ class RecordStrView(ConsoleView):
 /{contact[5] if contact[5] != None else ''}\
 /{contact[6] if contact[6] != None else ''}\
 /{contact[7] if contact[7] != None else ''}\n", "cyan")
-            result += info
-        return result
+            result.append(info)
+        return ''.join(result)
     
     def view_user_info(self, data):
         return colored(f"User: {data[0]} \
@@ -68,8 +86,10 @@ class RecordStrView(ConsoleView):
 
 
 class RecordRichView(ConsoleView):
+    # rich імпортується лише тоді, коли справді потрібна таблиця, щоб запуск у форматі str його не завантажував.
 
     def view_users_info(self, data):
+        from rich.table import Table
         users_table = Table(title="Contacts' info")
         columns_name = self.table_columns
         for col in columns_name:
@@ -81,6 +101,7 @@ class RecordRichView(ConsoleView):
         return users_table
     
     def view_user_info(self, data):
+        from rich.table import Table
         user_table = Table(title="Contact's info")
         columns_name = self.table_columns
         for col in columns_name:
@@ -92,6 +113,7 @@ class RecordRichView(ConsoleView):
         
 
     def view_messages(self, data: str):
+        from rich.table import Table
         messages_table = Table(title='Result Messages')
         messages_table.add_column("Message", justify="left", style="magenta")
         messages_table.add_column("Time", justify="left", style="cyan")
@@ -123,6 +145,11 @@ def declare_view_format(view_format):
     
 
 class Field:
+    # __slots__ замість __dict__ у кожному екземплярі: полів у книзі стільки ж, скільки значень у всіх контактах.
+    __slots__ = ('__value',)
+    # Значення, які часто повторюються у різних контактах (країна, місто, вулиця), зберігаються в одному екземплярі рядка.
+    interned = False
+
     def __init__(self, value) -> None:
         self.__value = None
         self.value = value
@@ -141,27 +168,54 @@ class Field:
     def __repr__(self) -> str:
         return str(self)
 
+    @classmethod
+    def restore(cls, value):
+        # Створює поле зі значення, яке вже пройшло перевірку (наприклад, прочитане зі сховища), без повторної валідації.
+        field = cls.__new__(cls)
+        field.__setstate__(value)
+        return field
+
+    def __getstate__(self):
+        return self.__value
+
+    def __setstate__(self, state):
+        # Файли, збережені до появи __slots__, містять стан у вигляді словника атрибутів.
+        if isinstance(state, dict):
+            state = state['_Field__value']
+        if self.interned and state is not None:
+            state = sys.intern(state)
+        self.__value = state
+
 
 class Name(Field):
+    __slots__ = ()
 
     @Field.value.setter
     def value(self, value):
-        if not re.match(r'[A-z\d _\.\(\)\/\\\,]{1,20}', value):
-            print(colored('Wrong format.', "red"))
-            raise ValueError
-        self._Field__value = value
+        self._Field__value = validate_name(value)
 
 
 # Для перевірки на правильність введення номеру телефону, використовуємо регулярний вираз, що українські номери 
 # обов'язково мають починатися з '+380' і ще 9 цифр. 
 class Phone(Field):
+    __slots__ = ()
 
     @Field.value.setter
     def value(self, value):
-        if not re.match(r'^\+380\d{9}$', value):
-            print(colored('Wrong format. Phone number should be in the format +380XXXXXXXXX.', "red"))
-            raise ValueError
-        self._Field__value = value
+        self._Field__value = validate_phone(value)
+
+
+# Приводить номер, записаний довільно ('050 123 45 67', '380501234567', '(050)123-45-67'), до формату +380XXXXXXXXX,
+# у якому номери зберігаються в Phone. Повертає None, якщо в рядку немає цифр.
+def normalize_phone(number: str):
+    digits = re.sub(r'\D', '', number)
+    if not digits:
+        return None
+    if len(digits) == 9:
+        digits = '380' + digits
+    elif len(digits) == 10 and digits.startswith('0'):
+        digits = '38' + digits
+    return '+' + digits
 
 
 # Для перевірки на правильність введення дати народження, необхідно щоб ми записували ці об'єкти як об'єкти
@@ -169,17 +223,11 @@ class Phone(Field):
 # "2/2/42", '50.20.2000' чи навіть '29.02.2001'.
 # Також варто уникати дат народження, які є у майбутньому. Це враховано у методі add_birthday класу Record.
 class Birthday(Field):
+    __slots__ = ()
 
     @Field.value.setter
     def value(self, value):
-        try:
-            self._Field__value = datetime.strptime(value, '%d.%m.%Y').date()
-        except ValueError:
-            print(colored('Wrong format. Enter birthday in format dd.mm.YYYY. Days in range(31), month in range(12)', "red"))
-            raise ValueError
-        if self.value >= datetime.now().date():
-            print(colored('The user has not been born yet.', "red"))
-            raise ValueError
+        self._Field__value = validate_birthday(value)
         
     def __str__(self):
         return self.value.strftime('%d.%m.%Y')
@@ -187,70 +235,65 @@ class Birthday(Field):
 
 # Для перевірки на правильність введення email пропоную використати регулярний вираз, який був у нас у автоперевірці.
 class Email(Field):
+    __slots__ = ()
 
     @Field.value.setter
     def value(self, value):
-        if not re.match(r'[A-Za-z]{1}[\w.]+@[a-zA-Z0-9]+\.[a-zA-Z]{2,}\b', value):
-            print(colored('Wrong format. Email should be in the format xxxxxx@xxx.xx', "red"))
-            raise ValueError
-        self._Field__value = value
+        self._Field__value = validate_email(value)
 
 
 class Country(Field):
+    __slots__ = ()
+    interned = True
 
     @Field.value.setter
     def value(self, value):
-        with open(countries_txt, 'r') as fh:
-            readlines = fh.readlines()
-            for line in readlines:
-                if value.lower() == 'russia':
-                    self._Field__value = 'a terrorist country'
-                    return ''
-                elif value.lower() == line.lower().strip():
-                    lst_value = value.lower().strip().split(' ')
-                    capitalize_value = [i.capitalize() for i in lst_value]
-                    self._Field__value = ' '.join(capitalize_value)
-                    return ''
-            raise ValueError
+        self._Field__value = validate_country(value)
         
     # Магічний метод 'setter', який перевіряє на правильність введеного користувачем значення і записує у поле 'self.__value' значення, якщо
     # введена країна існує.
 
 
 class City(Field):
+    __slots__ = ()
+    interned = True
 
     @Field.value.setter
     def value(self, value):
-        if not re.match(r'^[A-z]{2,25}$', value):
-            raise ValueError
-        self._Field__value = value
+        self._Field__value = sys.intern(validate_city(value))
     # Магічний метод 'setter', який перевіряє на правильність введеного користувачем значення і записує у поле 'self.__value' значення, якщо
     # введений населений пункт складається тільки з літер та має довжину не менше 2-ох літер.
 
 
 class Street(Field):
+    __slots__ = ()
+    interned = True
 
     @Field.value.setter
     def value(self, value):
-        if not re.match(r'^[A-z\d\.\-\(\)\:\_\,\/ ]{2,25}$', value):
-            raise ValueError
-        self._Field__value = value
+        self._Field__value = sys.intern(validate_street(value))
     # Магічний метод 'setter', який перевіряє на правильність введеного користувачем значення і записує у поле 'self.__value' значення, якщо
     # назва введеної вулиці починається з літери та може містити тільки цифри та букви.
 
 
 class House(Field):
+    __slots__ = ()
 
     @Field.value.setter
     def value(self, value):
-        if not re.match(r'[ A-z\d\-\\\/\.]{1,15}', value):
-            raise ValueError
-        self._Field__value = value
+        self._Field__value = validate_house(value)
     # Магічний метод 'setter', який перевіряє на правильність введеного користувачем значення і записує у поле 'self.__value' значення, якщо
     # введені назва/номер будинку складається з літер або цифр.
 
 
 class Record:
+    # _book - адресна книга, до якої належить запис. Вона веде журнал змін та індекси, тому кожен метод,
+    # що змінює запис, викликає self._changed(). Посилання не серіалізується разом із записом.
+    # _row - закешований результат info_list_format(); _changed() скидає його, тому повторний вивід
+    # незміненої книги не форматує поля заново. Кеш теж не серіалізується.
+    __slots__ = ('name', 'phones', 'birthday', 'email', 'country', 'city', 'street', 'house', '_book', '_row')
+    stored_fields = __slots__[:-2]
+
     def __init__(self, name: Name, phone: Phone = None, birthday: Birthday = None, email: Email = None, 
                  country: Country = None, city: City = None, street: Street = None, house: House = None) -> None:
         self.name = name
@@ -263,11 +306,31 @@ class Record:
         self.city = city
         self.street = street
         self.house = house
+        self._book = None
+        self._row = None
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in self.stored_fields)
+
+    def __setstate__(self, state):
+        # Файли, збережені до появи __slots__, містять стан у вигляді словника атрибутів.
+        if isinstance(state, dict):
+            state = tuple(state.get(field, [] if field == 'phones' else None) for field in self.stored_fields)
+        for field, value in zip(self.stored_fields, state):
+            setattr(self, field, value)
+        self._book = None
+        self._row = None
+
+    def _changed(self):
+        self._row = None
+        if self._book is not None:
+            self._book.record_changed(self)
 
     def add_user(self, name: Name):
         # view: RecordRichView | RecordStrView = self.view_formats.get(view_format)
         if not name.value:
             self.name = name
+            self._changed()
             return users_view.view_format.view_messages(f"Record for user {name} was created")
         return users_view.view_format.view_messages(f"Record for user {name} already exist in this address book")
     
@@ -275,6 +338,7 @@ class Record:
     def add_phone(self, phone: Phone):
         if phone.value not in [phone_.value for phone_ in self.phones] and len(self.phones) <= 3:
             self.phones.append(phone)
+            self._changed()
             return users_view.view_format.view_messages(f"phone {phone} was added to contact {self.name}")
         
         return users_view.view_format.view_messages(
@@ -285,6 +349,7 @@ class Record:
         for idx, p in enumerate(self.phones):
             if old_phone.value == p.value:
                 self.phones[idx] = new_phone
+                self._changed()
                 return users_view.view_format.view_messages(f'Old phone: {old_phone} was changed to new: {new_phone}')
         
         return users_view.view_format.view_messages(f"Phone: {old_phone} is not present in {self.name}'s phones")
@@ -293,6 +358,7 @@ class Record:
         for p in self.phones:
             if phone.value == p.value:
                 self.phones.remove(p)
+                self._changed()
                 return users_view.view_format.view_messages(f'Phone: {phone} in contact {self.name} was deleted successfully')
         
         return users_view.view_format.view_messages(f"Phone: {phone} is not present in {self.name}'s list of phones")
@@ -304,10 +370,12 @@ class Record:
                 f'Birthday for user {self.name} already exists. Use command "change birthday".'
             )
         self.birthday = birthday
+        self._changed()
         return users_view.view_format.view_messages(f'Birthday for user {self.name} was added successfully.')
         
     def change_birthday(self, birthday: Birthday):
         self.birthday = birthday
+        self._changed()
         return users_view.view_format.view_messages(f'Birthday for contact {self.name} was changed successfully')
     
     def delete_birthday(self):
@@ -315,18 +383,21 @@ class Record:
             return users_view.view_format.view_messages(f"You haven't included birthday for contact {self.name} yet")
         
         self.birthday = None
+        self._changed()
         return users_view.view_format.view_messages(f'Birthday for contact {self.name} was successfully deleted')
 
     # Функція додає email користувача. Перевірка на правильність прописана у класі Email.
     def add_email(self, email: Email):
         if not self.email:
             self.email = email
+            self._changed()
             return users_view.view_format.view_messages(f'E-mail for user {self.name} was added successfully')
         
         return users_view.view_format.view_messages('Email for contact {self.name} already exists. Use command "change email"')
     
     def change_email(self, email: Email):
         self.email = email
+        self._changed()
         return users_view.view_format.view_messages(f'Email for contact {self.name} was changed successfully')
     
     def delete_email(self):
@@ -334,6 +405,7 @@ class Record:
             return users_view.view_format.view_messages(f"You haven't included birthday for contact {self.name} yet")
         
         self.email = None
+        self._changed()
         return users_view.view_format.view_messages(f'Email for contact {self.name} was deleted successfully')
     
     def days_to_birthday(self):  # Функція повертає кількість днів до дня народження користувача.
@@ -341,12 +413,8 @@ class Record:
             return users_view.view_format.view_messages(f'No data for birthday of user {self.name}')
         
         today = datetime.now().date()
-        try:
-            bd_current_year = self.birthday.value.replace(year=today.year)
-            bd_next_year = self.birthday.value.replace(year=today.year + 1)
-        except ValueError:
-            bd_current_year = self.birthday.value.replace(today.year, 2, 28)
-            bd_next_year = self.birthday.value.replace(today.year + 1, 2, 28)
+        bd_current_year = birthday_in_year(self.birthday.value, today.year)
+        bd_next_year = birthday_in_year(self.birthday.value, today.year + 1)
         diff_years = today.year - self.birthday.value.year
         if (bd_current_year - today).days == 0:
             return users_view.view_format.view_messages(f"Today {self.name} celebrate {diff_years} birthday. Don't forget to buy a gift.")
@@ -356,17 +424,14 @@ class Record:
         diff_days = (bd_next_year - today).days
         return users_view.view_format.view_messages(f"There are {diff_days} days left until the {self.name}'s {diff_years + 1} birthday")
     
-    def days_to_birthday_int_numbers(self) -> int:  # Функція повертає кількість днів до дня народження користувача.
+    def days_to_birthday_int_numbers(self, today=None) -> int:  # Функція повертає кількість днів до дня народження користувача.
         if not self.birthday:
              return -1 # якщо дати народження нема, то повертає -1
         
-        today = datetime.now().date()
-        try:
-            bd_current_year = self.birthday.value.replace(year=today.year)
-            bd_next_year = self.birthday.value.replace(year=today.year + 1)
-        except ValueError:
-            bd_current_year = self.birthday.value.replace(today.year, 2, 28)
-            bd_next_year = self.birthday.value.replace(today.year + 1, 2, 28)
+        if today is None:
+            today = datetime.now().date()
+        bd_current_year = birthday_in_year(self.birthday.value, today.year)
+        bd_next_year = birthday_in_year(self.birthday.value, today.year + 1)
         if (bd_current_year - today).days == 0:
             return 0
         elif (bd_current_year - today).days > 0:
@@ -380,6 +445,7 @@ class Record:
         self.city = city
         self.street = street
         self.house = house
+        self._changed()
         return users_view.view_format.view_messages(f'Address for user {self.name} was added successfully')
     # метод добавляє адресу проживання у поле self.address
         
@@ -405,26 +471,31 @@ class Record:
         
     def change_country(self, country: Country):
         self.country = country
+        self._changed()
         return users_view.view_format.view_messages(f'Country address for user {self.name} was changed successfully')
     
     def delete_country(self):
         if not self.country:
             return users_view.view_format.view_messages('You have not included country address yet')
         self.country = None
+        self._changed()
         return users_view.view_format.view_messages(f'Country address for contact {self.name} was deleted successfully')
     
     def change_city(self, city: City):
         self.city = city
+        self._changed()
         return users_view.view_format.view_messages(f'City address for user {self.name} was changed successfully')
     
     def delete_city(self):
         if not self.city:
             return users_view.view_format.view_messages('You have not included city address yet')
         self.city = None
+        self._changed()
         return users_view.view_format.view_messages(f'City address for contact {self.name} was deleted successfully')
     
     def change_street(self, street: Street):
         self.street = street
+        self._changed()
         return users_view.view_format.view_messages(f'Street address for user {self.name} was changed successfully')
     
     def delete_street(self):
@@ -432,11 +503,13 @@ class Record:
             return users_view.view_format.view_messages('You have not included street address yet')
         
         self.street = None
+        self._changed()
         return users_view.view_format.view_messages(f'Street address for contact {self.name} was deleted successfully')
 
     def change_house(self, house: House):
 
         self.house = house
+        self._changed()
         return users_view.view_format.view_messages((f'House address for user {self.name} was changed successfully'))
     
     def delete_house(self):
@@ -444,12 +517,16 @@ class Record:
             return users_view.view_format.view_messages('You have not included house address yet')
         
         self.house = None
+        self._changed()
         return users_view.view_format.view_messages(f'House address for contact {self.name} was deleted successfully')
       
-    # Рядкове представлення для одного запису у contact_book
+    # Рядкове представлення для одного запису у contact_book. Список кешується до наступної зміни запису,
+    # тому його не можна змінювати на місці.
     def info_list_format(self) -> list:
+        if self._row is not None:
+            return self._row
         phones = ', '.join(str(phone) for phone in self.phones) if self.phones != [] else 'empty'
-        return [
+        self._row = [
             str(self.name), 
             phones, 
             str(self.birthday) if self.birthday != None else 'empy', 
@@ -459,6 +536,7 @@ class Record:
             str(self.street) if self.street != None else 'empty', 
             str(self.house) if self.house != None else 'empty'
         ]
+        return self._row
 
     def user_info(self):
         return users_view.view_format.view_user_info(self.info_list_format())
@@ -481,232 +559,250 @@ class AddressBook(UserDict):
     # view_formats = {1: str_view_format, 2: rich_view_format}
     # format_view: RecordStrView | RecordRichView = None
 
+    # Книга зберігається через один з бекендів з модуля contact_book_storage (pickle-знімок з журналом або SQLite).
+    # Кожна зміна одразу передається бекенду через self.storage.put/delete.
+
+    # Додаткові індекси будуються з усіх записів лише під час першого запиту, якому вони потрібні,
+    # і далі оновлюються разом з кожною зміною книги.
+    page_size = 50  # кількість контактів на одній сторінці виводу
+    # Для великої книги, записи якої сховище не тримає в пам'яті (SQLite), запити про дні народження рахуються колонками
+    # NumPy (contact_book_analytics), якщо вона встановлена: так не потрібно читати всі записи, щоб побудувати індекс.
+    columnar_threshold = 20_000
+
+    index_types = {
+        'birthdays': BirthdayIndex,
+        'search': NgramIndex,
+        'phones': PhoneIndex,
+        'names': NameIndex,
+        'birthdates': BirthdateIndex,
+    }
+
+    def __init__(self, *args, **kwargs):
+        self.storage = None
+        self.indexes = {}
+        self.columns = None
+        super().__init__(*args, **kwargs)
+
+    def index(self, name):
+        index = self.indexes.get(name)
+        if index is None:
+            index = self.index_types[name]().build(self.data.values())
+            self.indexes[name] = index
+        return index
+
+    def birthday_columns(self):
+        # Колонки дат народження, прочитані зі сховища без створення записів. None, якщо книга мала, NumPy не встановлена
+        # або сховище не вміє віддати самі дати. Після будь-якої зміни книги колонки будуються заново під час наступного запиту.
+        if self.columns is None and self.storage is not None and len(self.data) >= self.columnar_threshold:
+            pairs = self.storage.birthdays()
+            numpy = load_numpy() if pairs is not None else None
+            if numpy is not None:
+                self.columns = BirthdayColumns(pairs, numpy, self.data.__getitem__)
+        return self.columns
+
+    def _birthdays_source(self, index_name):
+        # Побудований індекс оновлюється разом з книгою і завжди швидший, тому колонки використовуються лише замість
+        # побудови нового індексу для великої книги.
+        if index_name not in self.indexes:
+            columns = self.birthday_columns()
+            if columns is not None:
+                return columns
+        return self.index(index_name)
+
     def add_record(self, record: Record):
-        self.data[str(record.name)] = record
+        self._add(record)
         return users_view.view_format.view_messages(f"Contact {record.name} was added successfully")
+
+    def add_records(self, records):
+        # Додає багато записів однією операцією запису у сховище (наприклад, під час імпорту).
+        if self.storage is None:
+            for record in records:
+                self._add(record)
+            return
+        with self.storage.bulk():
+            for record in records:
+                self._add(record)
+
+    def _add(self, record: Record):
+        previous = self._loaded(str(record.name))
+        if previous is not None:
+            self._release(previous)
+        record._book = self
+        self.data[str(record.name)] = record
+        for index in self.indexes.values():
+            index.add(record)
+        self._store(str(record.name), record)
     
     def change_rec_name(self, old_name: Name, new_name: Name):
-        for key in self.data.keys():
-            if key == old_name.value:
-                old_rec = self.data.pop(key)
-                old_rec.name = new_name
-                self.data.update({str(new_name): old_rec})
-                return users_view.view_format.view_messages(f'Contact with name {old_name} was changed to name {new_name}')
+        if old_name.value in self.data:
+            old_rec = self.data.pop(old_name.value)
+            old_rec.name = new_name
+            old_rec._row = None  # закешований рядок містить старе ім'я
+            replaced = self._loaded(str(new_name))
+            if replaced is not None:
+                self._release(replaced)
+            self.data.update({str(new_name): old_rec})
+            self._reindex(old_rec)
+            self._store(old_name.value, None)
+            self._store(str(new_name), old_rec)
+            return users_view.view_format.view_messages(f'Contact with name {old_name} was changed to name {new_name}')
         return users_view.view_format.view_messages((f'There is not contact with name: {old_name}'))
     
     def delete_rec(self, name: Name):
-        for key in self.data.keys():
-            if str(key) == name.value:
-                self.data.pop(key)
-                return users_view.view_format.view_messages(f'Contact with name: {name} was deleted successfully')
+        if name.value in self.data:
+            self._release(self.data.pop(name.value))
+            self._store(name.value, None)
+            return users_view.view_format.view_messages(f'Contact with name: {name} was deleted successfully')
         return users_view.view_format.view_messages(f'There is not contact with name: {name}')
-    
+
+    def record_changed(self, record: Record):
+        # Викликається записом після кожної зміни його полів.
+        self._reindex(record)
+        self._store(str(record.name), record)
+
+    def _reindex(self, record: Record):
+        for index in self.indexes.values():
+            index.update(record)
+
+    def _unindex(self, record: Record):
+        for index in self.indexes.values():
+            index.discard(record)
+
+    def _loaded(self, name):
+        # Запис з іменем name, якщо він уже є в пам'яті. SQLiteRecords тримає прочитані записи у cache, а решту - лише
+        # в базі: для них немає ні об'єкта, прив'язаного до книги, ні місця в індексах, тому базу тут не читаємо.
+        return getattr(self.data, 'cache', self.data).get(name)
+
+    def _release(self, record: Record):
+        # Запис покидає книгу (видалений або замінений іншим): він зникає з індексів, а його подальші зміни
+        # більше не потрапляють у книгу та сховище.
+        self._unindex(record)
+        record._book = None
+
+    def _store(self, name, record):
+        self.columns = None  # колонки дат народження не оновлюються частково
+        if self.storage is None:  # книга ще не прив'язана до файлу
+            return
+        if record is None:
+            self.storage.delete(name)
+        else:
+            self.storage.put(name, record)
+
     def save_to_file(self, filename):
-        with open(filename, mode="wb") as file:
-            pickle.dump(self.data, file)
-            print(colored("\nContack book has saved.", "green"))
+        if self.storage is None:
+            from contact_book_storage import storage_for
+            self.storage = storage_for(filename)
+        self.storage.save(self.data)
+        print(colored("\nContack book has saved.", "green"))
 
     def load_from_file(self, filename):
-        try:
-            with open(filename, 'rb') as f:
-                self.data = pickle.load(f)
-                print(colored("\nContact book has loaded.", "green"))
-        except (FileNotFoundError, pickle.UnpicklingError):
-            with open(filename, 'wb') as f:
-                self.data = {}
-                pickle.dump(self.data, f)
+        from contact_book_storage import storage_for
+        if self.storage is not None:  # книга завантажується повторно: старі записи відв'язуються, а сховище закривається
+            for record in list(getattr(self.data, 'cache', self.data).values()):
+                record._book = None
+            self.storage.close()
+        self.storage = storage_for(filename)
+        self.data = self.storage.load(self)
+        self.indexes = {}
+        self.columns = None
+        print(colored("\nContact book has loaded.", "green"))
 
     def search_match(self, match):
-        found_match = []
-        for item in self.data.values():
-            if match in str(item):
-                found_match.append(item.info_list_format())
+        found_match = [rec.info_list_format() for rec in self.index('search').search(match)]
         if len(found_match) == 0:  # Якщо не знайшло збігів
             return users_view.view_format.view_messages(f"\nNo matches found for '{match}' in whole addressbook")
         else:
             print(users_view.view_format.view_some_info(f"\nWe found matches for '{match}' in {len(found_match)} contacts in whole contactbook: "))
-            return users_view.view_format.view_users_info(found_match) # '\n'.join(el for el in found_match)
+            return self._users_view(found_match, len(found_match))
+
+    def who_is_many(self, numbers) -> dict:
+        # Пакетний пошук власників номерів (наприклад, з журналу дзвінків): 'номер -> список записів'.
+        index = self.index('phones')
+        result = {}
+        for number in numbers:
+            phone = normalize_phone(number)
+            result[number] = index.lookup(phone) if phone else []
+        return result
+
+    def who_is(self, number: str):
+        owners = self.who_is_many([number])[number]
+        if len(owners) == 0:
+            return users_view.view_format.view_messages(f"\nNo contacts with phone '{number}' in whole addressbook")
+        return self.users_info(owners)
+
+    def _birthdays_result(self, records: list, empty_message: str, found_message: str):
+        if len(records) == 0:
+            return users_view.view_format.view_messages(empty_message)
+        print(users_view.view_format.view_some_info(f'\n{len(records)} {found_message}: '))
+        return self.users_info(records)
 
     def congrats_list(self, shift_days, record: Record = None):
-        congrats_dict = {}
-        for record in self.data.values():
-            res = record.days_to_birthday_int_numbers()
-            if 0 <= res <= shift_days:
-                congrats_dict[str(record.name)] = res
-        new_dict = defaultdict(list)
-        for rec, res in congrats_dict.items():
-            rec: Record = self.data.get(rec)
-            new_dict[res].append(rec.info_list_format())
-        sorted_list = sorted(new_dict.items())
-        if len(congrats_dict) == 0:
-            return users_view.view_format.view_messages(f'No users are celebrating birthday in the next {shift_days} days')
-        else:
-            almost_list = []
-            for el in sorted_list:
-                almost_list.append(el[1])
-            congrats_list = []
-            for lst in almost_list:
-                for el in lst:
-                    congrats_list.append(el)
-            print(users_view.view_format.view_some_info(
-                f'\n{len(congrats_dict)} users are celebrating their birthday in the next {shift_days} days: '
-                )
-            )
-            return users_view.view_format.view_users_info(congrats_list) # '\n'.join(el for el in congrats_list)
+        today = datetime.now().date()
+        congrats_list = self._birthdays_source('birthdays').window(today, 0, shift_days)
+        return self._birthdays_result(
+            congrats_list,
+            f'No users are celebrating birthday in the next {shift_days} days',
+            f'users are celebrating their birthday in the next {shift_days} days'
+        )
         
     def next_week_birthdays(self):
-        next_week_dict = {}
-        today = datetime.now().date().weekday()
-        for record in self.data.values():
-            res = record.days_to_birthday_int_numbers()
-            if (7 - today) <= res < (14 - today):
-                next_week_dict[str(record.name)] = res
-        new_dict = defaultdict(list)
-        for rec, res in next_week_dict.items():
-            rec: Record = self.data.get(rec)
-            new_dict[res].append(rec.info_list_format())
-        sorted_list = sorted(new_dict.items())
-        if len(next_week_dict) == 0:
-            return users_view.view_format.view_messages(f'No users are celebrating birthday in the next week')
-        else:
-            almost_list = []
-            for el in sorted_list:
-                almost_list.append(el[1])
-            congrats_list = []
-            for lst in almost_list:
-                for el in lst:
-                    congrats_list.append(el)
-            print(users_view.view_format.view_some_info(f'\n{len(congrats_list)} users are celebrating their birthday in the next week: '))
-            return users_view.view_format.view_users_info(congrats_list) #'\n'.join(el for el in congrats_list)
+        today = datetime.now().date()
+        weekday = today.weekday()
+        congrats_list = self._birthdays_source('birthdays').window(today, 7 - weekday, 13 - weekday)
+        return self._birthdays_result(
+            congrats_list,
+            'No users are celebrating birthday in the next week',
+            'users are celebrating their birthday in the next week'
+        )
     
     def current_week_birthdays(self):
-        current_week_dict = {}
-        today = datetime.now().date().weekday()
-        for record in self.data.values():
-            res = record.days_to_birthday_int_numbers()
-            if 0 <= res < 7 - today:
-                current_week_dict[str(record.name)] = res
-        new_dict = defaultdict(list)
-        for rec, res in current_week_dict.items():
-            rec: Record = self.data.get(rec)
-            new_dict[res].append(rec.info_list_format())
-        sorted_list = sorted(new_dict.items())
-        if len(current_week_dict) == 0:
-            return users_view.view_format.view_messages(f'No users are celebrating birthday in the current week')
-        else:
-            almost_list = []
-            for el in sorted_list:
-                almost_list.append(el[1])
-            congrats_list = []
-            for lst in almost_list:
-                for el in lst:
-                    congrats_list.append(el)
-            print(users_view.view_format.view_some_info(
-                f'\n{len(congrats_list)} users are celebrating their birthday in the current week: '
-                )
-            )
-            return users_view.view_format.view_users_info(congrats_list) #'\n'.join(el for el in congrats_list)
+        today = datetime.now().date()
+        weekday = today.weekday()
+        congrats_list = self._birthdays_source('birthdays').window(today, 0, 6 - weekday)
+        return self._birthdays_result(
+            congrats_list,
+            'No users are celebrating birthday in the current week',
+            'users are celebrating their birthday in the current week'
+        )
 
     def next_month_birthdays(self, record: Record = None):
-        next_month_dict = {}
         current_month = datetime.now().date().month
-        for record in self.data.values():
-            if not record.birthday:
-                continue
-            else:
-                if current_month == 12:
-                    if record.birthday.value.month == current_month - 11:
-                        next_month_dict[str(record.name)] = record.birthday.value.day
-                    new_dict = defaultdict(list)
-                    for rec, res in next_month_dict.items():
-                        rec: Record = self.data.get(rec)
-                        new_dict[res].append(rec.info_list_format())
-                    sorted_list = sorted(new_dict.items())
-                else:    
-                    if record.birthday.value.month == current_month + 1:
-                        next_month_dict[str(record.name)] = record.birthday.value.day
-                    new_dict = defaultdict(list)
-                    for rec, res in next_month_dict.items():
-                        rec: Record = self.data.get(rec)
-                        new_dict[res].append(rec.info_list_format())
-                    sorted_list = sorted(new_dict.items())
-        if len(next_month_dict) == 0:
-            return users_view.view_format.view_messages(f'No users are celebrating birthday in the next month')
-        else:
-            almost_list = []
-            for el in sorted_list:
-                almost_list.append(el[1])
-            congrats_list = []
-            for lst in almost_list:
-                for el in lst:
-                    congrats_list.append(el)
-            print(users_view.view_format.view_some_info(
-                f'\n{len(congrats_list)} users are celebrating their birthday in the next month: '
-                )
-            )
-            return users_view.view_format.view_users_info(congrats_list) #'\n'.join(el for el in congrats_list)
+        congrats_list = self._birthdays_source('birthdays').in_month(current_month % 12 + 1)
+        return self._birthdays_result(
+            congrats_list,
+            'No users are celebrating birthday in the next month',
+            'users are celebrating their birthday in the next month'
+        )
         
     def current_month_birthdays(self, record: Record = None):
-        current_month_dict = {}
         current_month = datetime.now().date().month
-        for record in self.data.values():
-            if not record.birthday:
-                continue
-            else:
-                if record.birthday.value.month == current_month:
-                    current_month_dict[str(record.name)] = record.birthday.value.day
-        new_dict = defaultdict(list)
-        for rec, res in current_month_dict.items():
-            rec: Record = self.data.get(rec)
-            new_dict[res].append(rec.info_list_format())
-        sorted_list = sorted(new_dict.items())
-        if len(current_month_dict) == 0:
-            return users_view.view_format.view_messages(f'No users are celebrating birthday in the current month')
-        else:
-            almost_list = []
-            for el in sorted_list:
-                almost_list.append(el[1])
-            congrats_list = []
-            for lst in almost_list:
-                for el in lst:
-                    congrats_list.append(el)
-            print(users_view.view_format.view_some_info(
-                f'\n{len(congrats_list)} users are celebrating their birthday in the current month: '
-                )
-            )
-            return users_view.view_format.view_users_info(congrats_list) #'\n'.join(el for el in congrats_list)
+        congrats_list = self._birthdays_source('birthdays').in_month(current_month)
+        return self._birthdays_result(
+            congrats_list,
+            'No users are celebrating birthday in the current month',
+            'users are celebrating their birthday in the current month'
+        )
 
-    def sort_by_name(self, record: Record=None):  # Функція сортує по імені всю книгу контактів.
-        contactbook_dict = {}
-        for record in self.data.values():
-            contactbook_dict[record.name.value] = record.info_list_format()
+    def sort_by_name(self, record: Record=None, limit: int = None, offset: int = 0):  # Функція сортує по імені всю книгу контактів.
+        # Записи беруться з відсортованого індексу по одному, тому для limit перших контактів книга не сортується повністю.
+        index = self.index('names')
         print(users_view.view_format.view_some_info('\nYour contactbook is sorted due to the name of users: \n'))
-        sorted_contcact_book = sorted(contactbook_dict.values())
-        return users_view.view_format.view_users_info(sorted_contcact_book) #'\n'.join(el for el in sorted(contactbook_dict.values()))
-
-    def sort_by_age(self, record: Record=None):  # Функція сортує contactbook по віку користувача.
-        contactbook_dict = {}
-        for record in self.data.values():
-            if record.birthday:
-                res = record.how_much_user_live_int()
-                contactbook_dict[str(record.name)] = res
-        new_dict = defaultdict(list)
-        for rec, res in contactbook_dict.items():
-            rec: Record = self.data.get(rec)
-            new_dict[res].append(rec.info_list_format())
-        sorted_list = sorted(new_dict.items(), reverse=True)
-        if len(contactbook_dict) == 0:
+        rows = (rec.info_list_format() for rec in index.walk(offset, limit))
+        return self._users_view(rows, self._window_size(len(index), limit, offset))
+
+    def sort_by_age(self, record: Record=None, limit: int = None, offset: int = 0, youngest: bool = False):
+        # Функція сортує contactbook по віку користувача: спочатку найстарші (або наймолодші, якщо youngest).
+        index = self._birthdays_source('birthdates')
+        if len(index) == 0:
             return users_view.view_format.view_messages(f'No data for birthday in all records.')
-        else:
-            almost_list = []
-            for el in sorted_list:
-                almost_list.append(el[1])
-            contactbook_list = []
-            for lst in almost_list:
-                for el in lst:
-                    contactbook_list.append(el)
         print(users_view.view_format.view_some_info('\nYour contactbook is sorted due to the age of users: \n'))
-        return users_view.view_format.view_users_info(contactbook_list) #'\n'.join(el for el in contactbook_list)
+        rows = (rec.info_list_format() for rec in index.walk(offset, limit, reverse=youngest))
+        return self._users_view(rows, self._window_size(len(index), limit, offset))
+
+    @staticmethod
+    def _window_size(total: int, limit: int, offset: int) -> int:
+        size = max(total - offset, 0)
+        return size if limit is None else min(size, limit)
 
     def __repr__(self):
         return str(self)
@@ -718,5 +814,24 @@ class AddressBook(UserDict):
         rec = self.data.get(str(name))
         return users_view.view_format.view_user_info((rec.info_list_format()))
 
+    def iter_pages(self, page_size: int = None):
+        # Курсор по книзі: віддає записи списками по page_size, читаючи їх зі сховища лише тоді, коли потрібна наступна сторінка.
+        records = iter(self.data.values())
+        while True:
+            page = list(islice(records, page_size or self.page_size))
+            if not page:
+                return
+            yield page
+
+    def _users_view(self, rows, count: int):
+        # Якщо рядків більше, ніж page_size, повертається генератор сторінок, який contact_book_main виводить через пейджер.
+        if count > self.page_size:
+            return users_view.view_format.iter_users_info(rows, self.page_size)
+        return users_view.view_format.view_users_info(rows)
+
+    def users_info(self, records):
+        return self._users_view((rec.info_list_format() for rec in records), len(records))
+
     def get_all_contacts(self):
-        return users_view.view_format.view_users_info(self.user_info_list())
+        rows = (rec.info_list_format() for page in self.iter_pages() for rec in page)
+        return self._users_view(rows, len(self.data))
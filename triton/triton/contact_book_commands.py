@@ -0,0 +1,144 @@
+class CommandTrie:
+    """Longest-match lookup of command keywords in user input"""
+
+    # Ключові слова команд розбиваються на слова, і кожне слово - це один крок у дереві. Тому команда знаходиться
+    # за один прохід по введеному рядку, а ключове слово збігається лише з цілими словами: '+' не перехоплює
+    # '+380...', а 'show' не перехоплює 'show all'. Якщо підходять кілька ключових слів, перемагає найдовше.
+    _command = object()  # ключ вузла, у якому закінчується ключове слово
+
+    def __init__(self, handlers: dict = None):
+        self.root = {}
+        for command, keywords in (handlers or {}).items():
+            for keyword in keywords:
+                self.add(keyword, command)
+
+    def add(self, keyword: str, command):
+        words = keyword.lower().split()
+        if not words:
+            raise ValueError('Command keyword can not be empty.')
+        node = self.root
+        for word in words:
+            node = node.setdefault(word, {})
+        node[self._command] = command
+
+    def remove(self, keyword: str):
+        # Прибирає ключове слово. Гілки дерева не видаляються: порожній вузол нічого не знаходить.
+        node = self.root
+        for word in keyword.lower().split():
+            node = node.get(word)
+            if node is None:
+                return
+        node.pop(self._command, None)
+
+    def match(self, user_input: str):
+        # Повертає (команда, аргументи після ключового слова) або (None, усі слова), якщо команду не знайдено.
+        return self.match_words(user_input.split())
+
+    def match_words(self, words: list):
+        # Те саме для вже розбитого на слова рядка (наприклад, shlex.split у пакетному режимі, де 'John Smith' - одне слово).
+        node = self.root
+        command, used = None, 0
+        for position, word in enumerate(words, start=1):
+            node = node.get(word.lower())
+            if node is None:
+                break
+            if self._command in node:
+                command, used = node[self._command], position
+        if command is None:
+            return None, words
+        return command, words[used:]
+
+
+class CommandSuggester:
+    """Closest command keywords for a mistyped command"""
+
+    # Індекс будується один раз: кожне ключове слово розбивається на біграми (з краями '^' і '$', щоб перша
+    # та остання літери теж враховувались). Для запиту беруться лише кілька слів з найбільшою кількістю спільних
+    # біграм, і тільки для них рахується відстань редагування. Перебирати всі команди на кожну помилку не потрібно.
+    candidates = 10
+
+    def __init__(self, keywords=()):
+        self.postings = {}  # біграма -> ключові слова, у яких вона є
+        self.keywords = set()
+        for keyword in keywords:
+            self.add(keyword)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return ' '.join(text.lower().split())
+
+    @staticmethod
+    def bigrams(text: str) -> set:
+        text = f'^{text}$'
+        return {text[i:i + 2] for i in range(len(text) - 1)}
+
+    def add(self, keyword: str):
+        keyword = self.normalize(keyword)
+        if keyword in self.keywords:
+            return
+        self.keywords.add(keyword)
+        for gram in self.bigrams(keyword):
+            self.postings.setdefault(gram, []).append(keyword)
+
+    def remove(self, keyword: str):
+        keyword = self.normalize(keyword)
+        if keyword not in self.keywords:
+            return
+        self.keywords.discard(keyword)
+        for gram in self.bigrams(keyword):
+            keywords = self.postings[gram]
+            keywords.remove(keyword)
+            if not keywords:
+                del self.postings[gram]
+
+    @staticmethod
+    def distance(a: str, b: str, limit: int) -> int:
+        # Відстань Дамерау-Левенштейна (заміна, вставка, видалення та перестановка сусідніх літер - одна правка).
+        # Рахуються лише клітинки на відстані не більше limit від діагоналі: решта все одно дала б більше limit правок.
+        # Як тільки весь рядок таблиці перевищує limit, повертається limit + 1.
+        too_far = limit + 1
+        width = len(b)
+        previous2, previous = None, [j if j <= limit else too_far for j in range(width + 1)]
+        for i in range(1, len(a) + 1):
+            current = [too_far] * (width + 1)
+            if i <= limit:
+                current[0] = i
+            char = a[i - 1]
+            best = current[0]
+            for j in range(max(1, i - limit), min(width, i + limit) + 1):
+                value = previous[j - 1] + (char != b[j - 1])
+                if previous[j] + 1 < value:
+                    value = previous[j] + 1
+                if current[j - 1] + 1 < value:
+                    value = current[j - 1] + 1
+                if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1] and previous2[j - 2] + 1 < value:
+                    value = previous2[j - 2] + 1
+                current[j] = value
+                if value < best:
+                    best = value
+            if best > limit:
+                return too_far
+            previous2, previous = previous, current
+        return min(previous[width], too_far)
+
+    def suggest(self, text: str, limit: int = 3, cutoff: float = 0.7) -> list:
+        # До limit пар (ключове слово, схожість від 0 до 1), від найближчого. Слова зі схожістю нижче cutoff відкидаються.
+        text = self.normalize(text)
+        grams = self.bigrams(text)
+        shared = {}
+        for gram in grams:
+            for keyword in self.postings.get(gram, ()):
+                shared[keyword] = shared.get(keyword, 0) + 1
+        closest = sorted(shared, key=lambda keyword: -shared[keyword])[:self.candidates]
+        scored = []
+        for keyword in closest:
+            longest = max(len(text), len(keyword))
+            allowed = int((1 - cutoff) * longest + 1e-9)  # найбільша кількість правок, яка ще дає схожість не нижче cutoff
+            # Одна правка змінює не більше трьох біграм, тому слова з малою кількістю спільних біграм відкидаються без підрахунку.
+            if abs(len(text) - len(keyword)) > allowed or (len(grams) - shared[keyword]) > 3 * allowed:
+                continue
+            edits = self.distance(text, keyword, allowed)
+            if edits <= allowed:
+                scored.append((keyword, 1 - edits / longest))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
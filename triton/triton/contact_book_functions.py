@@ -1,6 +1,8 @@
-import time
-import difflib 
+import csv
+from collections import deque
 import sys
+import time
+from types import GeneratorType
 from pathlib import Path
 from termcolor import colored
 
@@ -18,11 +20,15 @@ from contact_book_classes import (
     City, 
     Street, 
     House,
+    country_completions,
     declare_view_format
 )
+from contact_book_import import read_contacts, import_contacts
+from contact_book_commands import CommandTrie, CommandSuggester
+from contact_book_stats import STATS, profile_call
 
 contact_book = AddressBook()
-filename = 'contact_book.bin'
+filename = 'contact_book.db'  # старий 'contact_book.bin' імпортується автоматично під час першого запуску
 
 exit_inputs = ['stop', 'break', '-'] # список з варіантами відповідей, якщо користувач хоче завершити виконання команди
 
@@ -30,48 +36,90 @@ user_inputs = ['y', 'yes', '+']  #список з варіантами відп
 
 CHANGING_FUNCS = ['Country', 'City', 'Street', 'House']
 
+# Відповіді на запитання команд у пакетному режимі (contact_book_main.run_batch): слова з рядка скрипта
+# підставляються замість введення користувача у тому ж порядку, у якому команда їх запитує. None - звичайний режим.
+answers = None
+
+
+class BatchInputError(EOFError):
+    """Batch line has no valid value for a question of its command"""
+
+    # Успадковується від EOFError, а не від ValueError, щоб error_handler не перетворив помилку на звичайний результат
+    # і команда з рядка скрипта не продовжила роботу з неправильним значенням.
+
+
+def ask(question):
+    if answers is None:
+        started = time.perf_counter()
+        try:
+            return input(question)
+        finally:
+            STATS.prompt_seconds += time.perf_counter() - started
+    if not answers:
+        raise BatchInputError(f"Not enough arguments, the command asks: '{question.strip()}'")
+    return answers.popleft()
+
+
+def set_answers(values):
+    global answers
+    answers = deque(values) if values is not None else None
+
 
 def error_handler(func):
+    # Крім обробки помилок, рахує кількість викликів, час (без очікування введення) та помилки кожної команди (команда 'stats').
     def inner(*args):
+        started = STATS.start()
+        error = None
         try:
             result = func(*args)
             return result
-        except KeyError:
+        except KeyError as e:
+            error = e
             return colored(f"No user.", "red")
         # під час виконання різних методів виникають різні помилки ValueError. Тому пропоную їх перехоплювати у методах, 
         # щоб користувач знав у чому проблема. Крім того нам ще треба продумавти логіку для перехоплення помилок типу AttribiteError.
         except ValueError as e:
+            error = e
             return e
-        except IndexError:
+        except IndexError as e:
+            error = e
             return 'First you should enter the username and, if necessary, the required parameter'
         # Варто ще обробити помилки TypeError та AttribiteError. Вони точно будуть виникати під час роботи.
-        except TypeError:
+        except TypeError as e:
+            error = e
             return 'Wrong command or too many parameters are specified.'
-        except AttributeError:
+        except AttributeError as e:
+            error = e
             return "User doesn't exist. First create a record about this user."
+        except BaseException as e:  # решта помилок не обробляється, але теж потрапляє у статистику
+            error = e
+            raise
+        finally:
+            STATS.finish(func.__name__, started, error)
     return inner
 
 
 # Додано програму, яка одразу після запуску завантажує contact_book з файлу та видає привітальне повідомлення.
 def start():
-    contact_book.load_from_file(filename)
-    # Додаю невеликий привітальний текст. Тут в принципі можна й щось інше написати. І ще додав вивід кожного рядка за 1,5 секунди.
+    # Привітальний текст виводиться одразу, без пауз між рядками, а книга завантажується вже після нього.
     invitation_text = [colored("I will help you organize your contact book.", "cyan"), 
                         colored("Using the command 'help', you can find out the list of available operations.", "cyan"),
                         colored("Let's start and enjoy!!!", "cyan") ]
-    for string in invitation_text:
-        time.sleep(1)
-        print(string)
+    print('\n'.join(invitation_text))
+    contact_book.load_from_file(filename)
 
 def info_text():
+    if answers is not None:  # у пакетному режимі запитань немає
+        return
     info = 'To stop the execution enter one of these commands (stop, break, -)'
     print(info)
 
 @error_handler
 def helper(*args):
     res = ''
-    for value in HANDLERS.values():
-        res += f'{colored(value[0], "cyan")} : {colored(value[1], "yellow")}\n'
+    for command, value in HANDLERS.items():
+        keywords = ', '.join([value[1], *ALIASES.get(command, ())])
+        res += f'{colored(value[0], "cyan")} : {colored(keywords, "yellow")}\n'
     return '\nType one of the available commands from the list below:\n\n' + res
 
 
@@ -85,13 +133,15 @@ def exit_command(*args):
 def data_input(class_, question):
     while True:
         try:
-            answer = input(f'{question}: ')
+            answer = ask(f'{question}: ')
             if answer.lower().strip() in exit_inputs:
                 return 'exit'
             value = class_(answer.strip())
             return value
         except ValueError as e:
-            print(e)
+            if answers is not None:  # у пакетному режимі неправильне значення не перепитується
+                raise BatchInputError(str(e))
+            print(colored(str(e), "red"))
 
 
 def no_user(name):
@@ -113,6 +163,24 @@ def add_user_command(*args):
     return contact_book.add_record(rec)
 
 
+@error_handler
+def import_command(*args):  # Імпортує контакти з CSV або vCard (.vcf) файлу.
+    path = ask(colored('Enter the path to the CSV or vCard file with contacts: ', "yellow")).strip()
+    errors_path = path + '.errors.csv'
+    before = len(contact_book)
+    try:
+        result = import_contacts(contact_book, read_contacts(path), errors_path)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        # Частини, імпортовані до помилки, залишаються в книзі.
+        return colored(f"Can't import contacts from '{path}': {e}. "
+                       f"Contacts imported before the error: {len(contact_book) - before}", "red")
+    report = f"Imported {result['imported']} contacts, rejected {result['rejected']} rows " \
+             f"in {result['seconds']:.2f} s ({result['rows_per_sec']:.0f} rows/sec)"
+    if result['errors_path']:
+        report += f". Rejected rows with reasons are saved to {result['errors_path']}"
+    return colored(report, "yellow")
+
+
 @error_handler
 def change_user_command(*args):
     info_text()
@@ -283,7 +351,7 @@ def congrats_list_command(*args):  # Повертає список корист
         \nEnter the number of days (an integer): '''
         text = colored(f'There are {len(contact_book)} users in address book', "yellow")
         print(text)
-        shift_days = int(input(command_text))
+        shift_days = int(ask(command_text))
         return contact_book.congrats_list(shift_days)
 
 
@@ -309,7 +377,7 @@ def birthdays_current_month(*args):  # Користувачі, котрі свя
 
 @error_handler
 def how_long_user_live_command(*args):  # Функція повертає кількість прожитих днів користувачем.
-    name = Name(input('Enter name of the user: '))
+    name = Name(ask('Enter name of the user: '))
     rec: Record = contact_book.get(str(name))
     if rec:
         return rec.how_much_user_live()
@@ -318,14 +386,25 @@ def how_long_user_live_command(*args):  # Функція повертає кіл
         return res
 
 
+def listing_window(args):
+    # 'sort by age 10 20' - показати 10 контактів, пропустивши перші 20. Без чисел показується вся книга.
+    numbers = [int(arg) for arg in args if arg.isdigit()]
+    limit = numbers[0] if numbers else None
+    offset = numbers[1] if len(numbers) > 1 else 0
+    return limit, offset
+
+
 @error_handler
 def sort_by_name_command(args):
-    return contact_book.sort_by_name()
+    limit, offset = listing_window(args)
+    return contact_book.sort_by_name(limit=limit, offset=offset)
 
 
 @error_handler
-def sort_by_age_command(args):
-    return contact_book.sort_by_age()
+def sort_by_age_command(args):  # 'sort by age 5 youngest' - п'ять наймолодших контактів
+    limit, offset = listing_window(args)
+    youngest = any(arg.lower() == 'youngest' for arg in args)
+    return contact_book.sort_by_age(limit=limit, offset=offset, youngest=youngest)
 
 
 @error_handler
@@ -348,8 +427,9 @@ def input_checking(func):
         if class_ == Country or value in CHANGING_FUNCS:
             address = func(class_, value)
             return address
-        print(colored(f'Do you want to include {value}?', "yellow"))
-        answer = input('Y/N: ').strip()
+        if answers is None:
+            print(colored(f'Do you want to include {value}?', "yellow"))
+        answer = ask('Y/N: ').strip()
         if answer.lower() in user_inputs:
             address = func(class_, value) 
             return address
@@ -365,20 +445,27 @@ def input_checking(func):
 def address_input(class_, value):
     while True: 
         try:
-            address_value = input(f'Enter a {value}: ').strip()
+            address_value = ask(f'Enter a {value}: ').strip()
             if address_value.lower() in exit_inputs:
                 return 'exit'
             country = class_(address_value)
             return country
-        except:
+        except ValueError as e:
+            if answers is not None:
+                raise BatchInputError(str(e))
             print(colored('Wrong format, try again', "red"))
+            if class_ == Country:
+                completions = country_completions(address_value)
+                if completions:
+                    print(colored(f'Maybe you mean: {", ".join(completions)}', "yellow"))
     # поки користувач не введе правильне значення або одну з команд для виходу, функція буде запитувати
     # користувача на введеня даних
 
 
+@error_handler
 def add_address(*args):
     info_text()
-    name = Name(input('Enter the name of the contact: ').strip())
+    name = Name(ask('Enter the name of the contact: ').strip())
     #користувач вводить ім'я контакту 
     rec: Record = contact_book.get(str(name)) 
     #отримуємо інформацію про записаного користувача
@@ -416,7 +503,7 @@ def add_address(*args):
 @error_handler
 def change_country_command(*args):
     info_text()
-    name = Name(input('Enter the name of the contact: ').strip())
+    name = Name(ask('Enter the name of the contact: ').strip())
     rec: Record = contact_book.get(str(name))
     country = address_input(Country, 'Country') #отримуємо значення, яке користувач хоче додати
     if country == 'exit': # перевіряємо чи функція повернула нам команду для закінчення додавання адреси
@@ -427,7 +514,7 @@ def change_country_command(*args):
 @error_handler
 def change_city_command(*args):
     info_text()
-    name = Name(input('Enter the name of the contact: ').strip())
+    name = Name(ask('Enter the name of the contact: ').strip())
     rec: Record = contact_book.get(str(name))
     city = address_input(City, 'City')
     if city == 'exit':
@@ -437,7 +524,7 @@ def change_city_command(*args):
 
 @error_handler
 def change_street_command(*args):
-    name = Name(input('Enter the name of the contact: ').strip())
+    name = Name(ask('Enter the name of the contact: ').strip())
     rec: Record = contact_book.get(str(name))
     street = address_input(Street, 'Street')
     if street == 'exit':
@@ -447,7 +534,7 @@ def change_street_command(*args):
 
 @error_handler
 def change_house_command(*args):
-    name = Name(input('Enter the name of the contact: ').strip())
+    name = Name(ask('Enter the name of the contact: ').strip())
     rec: Record = contact_book.get(str(name))
     house = address_input(House, 'House')
     if house == 'exit':
@@ -502,18 +589,85 @@ def search_command(*args):  # Шукає задану послідовність
     ) 
         return command_text
     else:
-        match = input(colored('Enter what you want to find. Two characters minimum: ', "yellow"))
+        match = ask(colored('Enter what you want to find. Two characters minimum: ', "yellow"))
         if len(match) < 2:
             return colored('Search is too short. Enter at least 2 symbols.', "red")
         return contact_book.search_match(match)
 
 
+@error_handler
+def who_is_command(*args):  # Шукає контакт за номером телефону.
+    number = ask(colored('Enter the phone number of the caller: ', "yellow")).strip()
+    return contact_book.who_is(number)
+
+
+@error_handler
+def who_called_command(*args):  # Шукає власників усіх номерів з файлу журналу дзвінків (один номер на рядок).
+    path = ask(colored('Enter the path to the call log file: ', "yellow")).strip()
+    try:
+        with open(path, 'r', encoding='utf-8') as fh:
+            numbers = [line.strip().replace(';', ',').split(',')[0] for line in fh if line.strip()]
+    except (OSError, UnicodeDecodeError) as e:
+        return colored(f"Can't read the call log '{path}': {e}", "red")
+    owners = contact_book.who_is_many(numbers)
+    found = {}
+    unknown = []
+    for number, records in owners.items():
+        if records:
+            for rec in records:
+                found[str(rec.name)] = rec
+        else:
+            unknown.append(number)
+    print(colored(f'{len(numbers) - len(unknown)} of {len(numbers)} numbers belong to your contacts', "yellow"))
+    if unknown:
+        print(colored(f'Unknown numbers: {", ".join(unknown)}', "yellow"))
+    if not found:
+        return colored('None of these numbers is in your contact book', "red")
+    return contact_book.users_info(found.values())
+
+
+@error_handler
+def stats_command(args):
+    # 'stats' - таблиця часу команд, 'stats save stats.json' - зберегти у JSON, 'stats reset' - почати заново.
+    action = args[0].lower() if args else ''
+    if action == 'save':
+        path = args[1] if len(args) > 1 else 'contact_book_stats.json'
+        try:
+            STATS.dump(path)
+        except OSError as e:
+            return colored(f"Can't save command statistics to '{path}': {e}", "red")
+        return colored(f'Command statistics are saved to {path}', "yellow")
+    if action == 'reset':
+        STATS.reset()
+        return colored('Command statistics are reset', "yellow")
+    return colored(STATS.report(), "cyan")
+
+
+@error_handler
+def profile_command(args):
+    # 'profile sort by age' - виконує команду під cProfile і показує функції, на які пішло найбільше часу.
+    cmd, rest = COMMANDS.match_words(args)
+    if cmd is None or cmd is profile_command:
+        return colored('Enter a command to profile, for example: profile sort by age', "red")
+
+    def run():
+        result = cmd(rest)
+        if isinstance(result, GeneratorType):  # сторінки рендеряться ліниво, тому для профілю вони готуються одразу
+            result = (page for page in list(result))
+        return result
+
+    result, report = profile_call(run)
+    print(report)
+    return result
+
+
 HANDLERS = {
     add_user_command: ('11', 'add user', 'new user', 'create user', '+'),
     add_phone_command: ('12', 'add phone'),
     add_birthday_command: ('13', 'add birthday', 'birthday'),
     add_email_command: ('14', 'add email', 'email'),
     add_address: ('15','add address', 'new address',),
+    import_command: ('16', 'import contacts', 'import'),
     # редагування записів (21-28) 
     change_user_command: ('21', 'change user', 'change name'),
     change_phone_command: ('22', 'change phone',),
@@ -542,44 +696,64 @@ HANDLERS = {
     sort_by_age_command: ('53', 'sort by age'),
     show_all_command: ('55', 'show all', 'all phones', 'addressbook', 'contactbook', 'ірщц фдд'),
     show_user_command: ('66', 'show user', 'phone', 'number', 'show'),
+    who_is_command: ('67', 'who is', 'caller id'),
+    who_called_command: ('68', 'who called', 'call log'),
+    stats_command: ('88', 'stats', 'statistics'),
+    profile_command: ('89', 'profile'),
     search_command: ('77', 'search', 'find', 'match', 'іуфкср', 'аштв', 'ьфеср'),
     exit_command: ('99', 'exit', 'bye', 'end', 'close', 'goodbye', 'учше'),
     helper: ('00', 'help', 'рудз')
 }
 
-
-@error_handler
-def unknown_command(*args):
-    if len(args) == 3:
-        if 'birthday' or 'bd' in args[2]:
-            command = f'{args[0]} {args[1]} {args[2]}'
-    
-    elif len(args) == 2:
-        command = f'{args[0]} {args[1]}'
-
-    else:
-        command = args[0]
-
-    possibilities = []
-
-    for commands in HANDLERS.values():
-        possibilities.extend([i for i in commands])
-    
-    n = 1
-    cutoff = 0.7
-    close_matches = difflib.get_close_matches(command, 
-                possibilities, n, cutoff)
-    
-    if len(close_matches) != 0:
-        return colored(f'Did you mean {close_matches[0]}?', "yellow")
+COMMANDS = CommandTrie(HANDLERS)  # дерево ключових слів будується один раз, а не перебирається на кожну команду
+SUGGESTER = CommandSuggester(keyword for keywords in HANDLERS.values() for keyword in keywords)
+ALIASES = {}  # команда -> ключові слова, додані під час роботи програми; 'help' показує їх після основного
+
+
+def add_alias(command, alias: str):
+    # Додає ще одне ключове слово для команди під час роботи програми.
+    COMMANDS.add(alias, command)
+    SUGGESTER.add(alias)
+    aliases = ALIASES.setdefault(command, [])
+    if alias not in aliases and alias not in HANDLERS[command]:
+        aliases.append(alias)
+
+
+def remove_alias(command, alias: str) -> bool:
+    # Прибирає ключове слово, додане через add_alias. Вбудовані ключові слова з HANDLERS не прибираються.
+    aliases = ALIASES.get(command, [])
+    if alias not in aliases:
+        return False
+    aliases.remove(alias)
+    owner = next((cmd for cmd, keywords in HANDLERS.items() if alias in keywords), None)
+    if owner is not None:  # псевдонім перекривав ключове слово іншої команди, тому воно повертається їй
+        COMMANDS.add(alias, owner)
+        return True
+    COMMANDS.remove(alias)
+    SUGGESTER.remove(alias)
+    return True
+
+
+@error_handler
+def unknown_command(args):
+    # args - слова введеного рядка. Після команди можуть іти аргументи, тому з підказками порівнюються
+    # перші одне, два і три слова, і для кожної команди береться найкращий збіг.
+    words = args[:3]
+    scores = {}
+    for count in range(1, len(words) + 1):
+        for keyword, score in SUGGESTER.suggest(' '.join(words[:count])):
+            scores[keyword] = max(score, scores.get(keyword, 0))
+    if scores:
+        suggestions = sorted(scores, key=lambda keyword: (-scores[keyword], keyword))[:3]
+        return colored(f"Did you mean {' or '.join(suggestions)}?", "yellow")
     return colored('Unknown command. Try again', "red")
 
 
 def parse_input(user_input, view_format):
+    # Повертає команду з найдовшим ключовим словом на початку user_input і список слів після нього.
     declare_view_format(view_format=view_format)
 
-    for cmd, keywords in HANDLERS.items():
-        for kwd in keywords:
-            if user_input.lower().startswith(kwd):
-                return cmd, user_input
-    return unknown_command, user_input.strip().split()
+    cmd, args = COMMANDS.match(user_input)
+    if cmd is None:
+        return unknown_command, args
+    return cmd, args
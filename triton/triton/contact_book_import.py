@@ -0,0 +1,171 @@
+import csv
+from itertools import islice
+from pathlib import Path
+import time
+
+from contact_book_classes import (
+    Record, Name, Phone, Birthday, Email, Country, City, Street, House, normalize_phone
+)
+from contact_book_validation import validate_many
+
+# Поля рядка імпорту та класи, у які перетворюються перевірені значення. Телефонів може бути кілька, тому вони обробляються окремо.
+FIELDS = {
+    'birthday': Birthday,
+    'email': Email,
+    'country': Country,
+    'city': City,
+    'street': Street,
+    'house': House,
+}
+COLUMNS = ['name', 'phones', *FIELDS]
+VCARD_SUFFIXES = ('.vcf', '.vcard')
+
+
+def read_csv(path):
+    # Рядки CSV з заголовком. Назви колонок не залежать від регістру; телефони в одній колонці розділяються ';'.
+    with open(path, 'r', encoding='utf-8', newline='') as fh:
+        reader = csv.DictReader(fh)
+        for row in reader:
+            row = {str(key).strip().lower(): (value or '').strip() for key, value in row.items() if key}
+            if 'phone' in row and 'phones' not in row:
+                row['phones'] = row.pop('phone')
+            yield row
+
+
+def _vcard_date(value):
+    # BDAY у vCard записується як YYYY-MM-DD або YYYYMMDD, а книга очікує dd.mm.YYYY.
+    digits = value.replace('-', '')
+    if len(digits) == 8 and digits.isdigit():
+        return f'{digits[6:8]}.{digits[4:6]}.{digits[0:4]}'
+    return value
+
+
+def _vcard_lines(fh):
+    # Довгі рядки у vCard переносяться на наступний рядок, який починається з пробілу або табуляції.
+    line = None
+    for raw in fh:
+        raw = raw.rstrip('\r\n')
+        if raw[:1] in (' ', '\t') and line is not None:
+            line += raw[1:]
+            continue
+        if line is not None:
+            yield line
+        line = raw
+    if line is not None:
+        yield line
+
+
+def read_vcard(path):
+    with open(path, 'r', encoding='utf-8') as fh:
+        row = None
+        for line in _vcard_lines(fh):
+            key, _, value = line.partition(':')
+            key = key.split(';')[0].upper()
+            value = value.strip()
+            if key == 'BEGIN':
+                row = {'phones': []}
+            elif key == 'END' and row is not None:
+                row['phones'] = ';'.join(row['phones'])
+                yield row
+                row = None
+            elif row is None:
+                continue
+            elif key == 'FN':
+                row['name'] = value
+            elif key == 'N' and 'name' not in row:
+                row['name'] = ' '.join(part for part in reversed(value.split(';')[:2]) if part)
+            elif key == 'TEL':
+                row['phones'].append(value)
+            elif key == 'BDAY':
+                row['birthday'] = _vcard_date(value)
+            elif key == 'EMAIL':
+                row.setdefault('email', value)
+            elif key == 'ADR':
+                # ADR: поштова скринька; додаткова адреса; вулиця; місто; регіон; індекс; країна
+                parts = value.split(';') + [''] * 7
+                row['street'], row['city'], row['country'] = parts[2], parts[3], parts[6]
+
+
+def read_contacts(path):
+    if Path(path).suffix.lower() in VCARD_SUFFIXES:
+        return read_vcard(path)
+    return read_csv(path)
+
+
+def _phones(row: dict) -> list:
+    numbers = filter(None, (part.strip() for part in row.get('phones', '').split(';')))
+    return [normalize_phone(number) or number for number in numbers]
+
+
+def validate_batch(rows: list, known_names: set):
+    # Повертає (записи, відхилені рядки з причинами). Кожне поле перевіряється для всієї частини одним викликом validate_many,
+    # а записи збираються з уже перевірених значень без повторної валідації.
+    names = validate_many('name', [row.get('name', '') for row in rows])
+    phones = [_phones(row) for row in rows]
+    checked_phones = iter(validate_many('phone', [phone for numbers in phones for phone in numbers]))
+    columns = {
+        field: iter(validate_many(field, [row[field] for row in rows if row.get(field)]))
+        for field in FIELDS
+    }
+    records, rejected = [], []
+    for row, (name, error), numbers in zip(rows, names, phones):
+        errors = [error] if error else []
+        record = Record(Name.restore(name)) if name is not None else None
+        for _ in numbers:
+            phone, error = next(checked_phones)
+            if error:
+                errors.append(error)
+            elif record and phone not in [p.value for p in record.phones]:
+                record.phones.append(Phone.restore(phone))
+        for field, class_ in FIELDS.items():
+            if not row.get(field):
+                continue
+            value, error = next(columns[field])
+            if error:
+                errors.append(error)
+            elif record:
+                setattr(record, field, class_.restore(value))
+        if errors:
+            rejected.append((row, '; '.join(f"{e.field} '{e.value}': {e.message}" for e in errors)))
+        elif record.name.value in known_names:
+            rejected.append((row, f"contact '{record.name}' already exists"))
+        else:
+            known_names.add(record.name.value)
+            records.append(record)
+    return records, rejected
+
+
+def import_contacts(book, rows, errors_path, batch_size=1000):
+    # Потоково імпортує rows у book частинами по batch_size. Відхилені рядки пишуться у CSV errors_path з колонкою 'reason'.
+    started = time.perf_counter()
+    known_names = set(book.data)
+    imported = rejected_count = 0
+    errors_file = writer = None
+    rows = iter(rows)
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            records, rejected = validate_batch(batch, known_names)
+            book.add_records(records)
+            imported += len(records)
+            rejected_count += len(rejected)
+            if rejected and writer is None:
+                errors_file = open(errors_path, 'w', encoding='utf-8', newline='')
+                writer = csv.DictWriter(errors_file, fieldnames=[*COLUMNS, 'reason'], extrasaction='ignore')
+                writer.writeheader()
+            for row, reason in rejected:
+                writer.writerow({**row, 'reason': reason})
+    finally:
+        if errors_file is not None:
+            errors_file.close()
+    seconds = time.perf_counter() - started
+    total = imported + rejected_count
+    return {
+        'imported': imported,
+        'rejected': rejected_count,
+        'seconds': seconds,
+        'rows_per_sec': total / seconds if seconds else float(total),
+        'errors_path': errors_path if rejected_count else None,
+    }
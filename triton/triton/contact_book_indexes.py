@@ -0,0 +1,296 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from calendar import isleap
+from collections import defaultdict
+from datetime import date, timedelta
+from itertools import islice
+
+
+class RecordIndex(ABC):
+    """Secondary index over AddressBook records"""
+
+    # Індекс будується один раз з усіх записів (build), а далі AddressBook оновлює його після кожної зміни
+    # через add/discard/update. У self.keys зберігається ключ, під яким лежить кожен запис, щоб прибрати
+    # запис зі старого місця без повторного обчислення.
+
+    def __init__(self):
+        self.keys = {}
+
+    @abstractmethod
+    def key(self, record):
+        # Ключ запису в індексі. None означає, що запис не індексується (наприклад, немає дати народження).
+        pass
+
+    @abstractmethod
+    def insert(self, key, record):
+        pass
+
+    @abstractmethod
+    def remove(self, key, record):
+        pass
+
+    def build(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def add(self, record):
+        key = self.key(record)
+        if key is not None:
+            self.insert(key, record)
+        self.keys[record] = key
+
+    def discard(self, record):
+        if record in self.keys:
+            key = self.keys.pop(record)
+            if key is not None:
+                self.remove(key, record)
+
+    def update(self, record):
+        if record in self.keys and self.keys[record] == self.key(record):
+            return
+        self.discard(record)
+        self.add(record)
+
+
+def birthday_in_year(birthday: date, year: int) -> date:
+    # Дата святкування дня народження у заданому році. Ті, хто народився 29 лютого, у невисокосні роки святкують 28 лютого.
+    if birthday.month == 2 and birthday.day == 29 and not isleap(year):
+        return date(year, 2, 28)
+    return birthday.replace(year=year)
+
+
+class BirthdayIndex(RecordIndex):
+    """Records bucketed by (month, day) of birth"""
+
+    def __init__(self):
+        super().__init__()
+        self.buckets = defaultdict(dict)  # dict використовується як впорядкована множина записів
+
+    def key(self, record):
+        if not record.birthday:
+            return None
+        return record.birthday.value.month, record.birthday.value.day
+
+    def insert(self, key, record):
+        self.buckets[key][record] = None
+
+    def remove(self, key, record):
+        bucket = self.buckets[key]
+        del bucket[record]
+        if not bucket:
+            del self.buckets[key]
+
+    def celebrating_on(self, day: date) -> list:
+        # Записи, які святкують день народження саме в цей день, відсортовані за ім'ям.
+        records = list(self.buckets.get((day.month, day.day), ()))
+        if day.month == 2 and day.day == 28 and not isleap(day.year):
+            records.extend(self.buckets.get((2, 29), ()))
+        return sorted(records, key=lambda record: record.name.value)
+
+    def window(self, today: date, first: int, last: int) -> list:
+        # Записи, до дня народження яких від today залишилось від first до last днів включно, у порядку наближення дат.
+        # Проходить лише дні вікна (не більше року), тому вартість залежить від кількості знайдених записів, а не від розміру книги.
+        result = []
+        for shift in range(max(first, 0), min(last, 366) + 1):
+            day = today + timedelta(days=shift)
+            for record in self.celebrating_on(day):
+                if shift >= 365 and self._celebrates_before(record, today, shift):
+                    continue  # через рік від сьогодні - це вже наступне святкування, а не найближче
+                result.append(record)
+        return result
+
+    @staticmethod
+    def _celebrates_before(record, today: date, shift: int) -> bool:
+        birthday = record.birthday.value
+        for year in (today.year, today.year + 1):
+            days = (birthday_in_year(birthday, year) - today).days
+            if 0 <= days < shift:
+                return True
+        return False
+
+    def in_month(self, month: int) -> list:
+        # Записи, які народились у заданому місяці, відсортовані за днем народження та ім'ям.
+        result = []
+        for day in range(1, 32):
+            bucket = self.buckets.get((month, day), ())
+            result.extend(sorted(bucket, key=lambda record: record.name.value))
+        return result
+
+
+class NgramIndex(RecordIndex):
+    """Inverted index from 2- and 3-character substrings of contact fields to records"""
+
+    # Ключ запису - текст його полів, з'єднаний символом '\0', щоб n-грами не виходили за межі одного поля.
+    # Пошук бере списки записів для n-грам запиту, перетинає їх, починаючи з найкоротшого, і перевіряє
+    # кожного кандидата звичайним входженням підрядка.
+    separator = '\0'
+
+    def __init__(self):
+        super().__init__()
+        self.postings = defaultdict(set)
+
+    def key(self, record):
+        fields = [record.name, *record.phones, record.birthday, record.email,
+                  record.country, record.city, record.street, record.house]
+        return self.separator.join(str(field) for field in fields if field is not None)
+
+    @staticmethod
+    def ngrams(text: str) -> set:
+        grams = {text[i:i + 2] for i in range(len(text) - 1)}
+        grams.update(text[i:i + 3] for i in range(len(text) - 2))
+        return grams
+
+    def insert(self, key, record):
+        for gram in self.ngrams(key):
+            self.postings[gram].add(record)
+
+    def remove(self, key, record):
+        for gram in self.ngrams(key):
+            posting = self.postings[gram]
+            posting.discard(record)
+            if not posting:
+                del self.postings[gram]
+
+    def search(self, match: str) -> list:
+        # Записи, у полях яких є підрядок match, відсортовані за ім'ям. Для запитів, коротших за 2 символи,
+        # n-грам немає, тому ключі всіх записів перевіряються по черзі.
+        if len(match) < 2:
+            candidates = [record for record, key in self.keys.items() if key is not None and match in key]
+        elif len(match) == 2:
+            candidates = self.postings.get(match, set())
+        else:
+            grams = {match[i:i + 3] for i in range(len(match) - 2)}
+            postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            if len(match) > 3:
+                candidates = [record for record in candidates if match in self.keys[record]]
+        return sorted(candidates, key=lambda record: record.name.value)
+
+
+class PhoneIndex(RecordIndex):
+    """Reverse lookup from phone number to the records that have it"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = defaultdict(dict)
+
+    def key(self, record):
+        return tuple(phone.value for phone in record.phones) or None
+
+    def insert(self, key, record):
+        for phone in key:
+            self.records[phone][record] = None
+
+    def remove(self, key, record):
+        for phone in key:
+            owners = self.records[phone]
+            owners.pop(record, None)
+            if not owners:
+                del self.records[phone]
+
+    def lookup(self, phone: str) -> list:
+        return list(self.records.get(phone, ()))
+
+
+class SortedIndex(RecordIndex):
+    """Records kept in key order for sorted listings"""
+
+    # Пари (ключ, запис) зберігаються блоками, не більшими за 2*load елементів, відсортованими за ключем, а self.maxes -
+    # останні ключі блоків. Блок знаходиться двійковим пошуком по maxes, місце в блоці - двійковим пошуком по його ключах, тому
+    # вставка чи видалення зсуває не більше 2*load елементів одного блоку, а не всю книгу: O(log N + load).
+    # Переповнений блок ділиться навпіл, порожній прибирається. Ключі мають бути унікальними, тому до них додається
+    # ім'я контакту, і записи між собою ніколи не порівнюються.
+    load = 500
+
+    def __init__(self):
+        super().__init__()
+        self.key_blocks = []
+        self.record_blocks = []
+        self.maxes = []
+        self.size = 0
+
+    def build(self, records):
+        # Уся книга сортується один раз і ріжеться на блоки, а не вставляється запис за записом.
+        entries = []
+        for record in records:
+            key = self.key(record)
+            self.keys[record] = key
+            if key is not None:
+                entries.append((key, record))
+        entries.sort(key=lambda entry: entry[0])
+        self.key_blocks, self.record_blocks = [], []
+        for i in range(0, len(entries), self.load):
+            chunk = entries[i:i + self.load]
+            self.key_blocks.append([key for key, _ in chunk])
+            self.record_blocks.append([record for _, record in chunk])
+        self.maxes = [keys[-1] for keys in self.key_blocks]
+        self.size = len(entries)
+        return self
+
+    def insert(self, key, record):
+        if not self.maxes:
+            self.key_blocks, self.record_blocks, self.maxes = [[key]], [[record]], [key]
+            self.size = 1
+            return
+        block = min(bisect_left(self.maxes, key), len(self.maxes) - 1)
+        keys, records = self.key_blocks[block], self.record_blocks[block]
+        position = bisect_left(keys, key)
+        keys.insert(position, key)
+        records.insert(position, record)
+        self.maxes[block] = keys[-1]
+        self.size += 1
+        if len(keys) > 2 * self.load:
+            half = len(keys) // 2
+            self.key_blocks.insert(block + 1, keys[half:])
+            self.record_blocks.insert(block + 1, records[half:])
+            del keys[half:], records[half:]
+            self.maxes.insert(block, keys[-1])
+
+    def remove(self, key, record):
+        block = bisect_left(self.maxes, key)
+        keys, records = self.key_blocks[block], self.record_blocks[block]
+        position = bisect_left(keys, key)
+        del keys[position], records[position]
+        self.size -= 1
+        if keys:
+            self.maxes[block] = keys[-1]
+        else:
+            del self.key_blocks[block], self.record_blocks[block], self.maxes[block]
+
+    def __len__(self):
+        return self.size
+
+    def walk(self, offset: int = 0, limit: int = None, reverse: bool = False):
+        # Записи у порядку ключів (або у зворотному), починаючи з offset, не більше limit. Блоки до offset пропускаються
+        # цілком, а записи віддаються по одному, без копії списків.
+        blocks = reversed(self.record_blocks) if reverse else iter(self.record_blocks)
+        return islice(self._entries(blocks, offset, reverse), limit)
+
+    @staticmethod
+    def _entries(blocks, offset, reverse):
+        for records in blocks:
+            if offset >= len(records):
+                offset -= len(records)
+                continue
+            if reverse:
+                yield from islice(reversed(records), offset, None)
+            else:
+                yield from islice(records, offset, None)
+            offset = 0
+
+
+class NameIndex(SortedIndex):
+    """Records sorted by name"""
+
+    def key(self, record):
+        return record.name.value
+
+
+class BirthdateIndex(SortedIndex):
+    """Records with a birthday sorted from the oldest to the youngest"""
+
+    def key(self, record):
+        if not record.birthday:
+            return None
+        return record.birthday.value, record.name.value
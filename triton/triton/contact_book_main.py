@@ -1,35 +1,112 @@
+import shlex
 import sys
 from pathlib import Path
+from types import GeneratorType
 
 triton_path = Path(__file__).parent.parent
 sys.path.append(str(triton_path))
 
-from contact_book_functions import parse_input, exit_command, start
+from contact_book_functions import (
+    parse_input, exit_command, start, unknown_command, contact_book, filename, COMMANDS, set_answers
+)
+from contact_book_classes import declare_view_format
 
-from rich.table import Table
-from rich.console import Console
 # Внаслідок перейменування пакетів оновлено імпорт пакетів
 
 
 
+def show_pages(pages, view_format, console):
+    # Пейджер для великих результатів: наступна сторінка рендериться лише тоді, коли користувач її попросить.
+    for number, page in enumerate(pages, start=1):
+        if view_format == 1:
+            print(page)
+        else:
+            console.print(page)
+        answer = input(f"Page {number}. Press Enter to see the next page or type 'q' to stop: ")
+        if answer.strip().lower() in ('q', 'stop', 'break', '-'):
+            pages.close()
+            break
+
+
+def show_result(result, view_format, console, paged=True):
+    if isinstance(result, GeneratorType):
+        if paged:
+            show_pages(result, view_format, console)
+        else:
+            for page in result:
+                show_result(page, view_format, console)
+    elif view_format == 1:
+        print(result)
+    else:
+        from rich.table import Table
+        if isinstance(result, Table):
+            console.print(result)
+        else:
+            print(result)
+
+
+def get_console(view_format):
+    # rich завантажується лише для формату 2 (таблиці); для формату str консоль не потрібна.
+    if view_format == 1:
+        return None
+    from rich.console import Console
+    return Console()
+
+
+def run_batch(lines, view_format=1) -> int:
+    # Пакетний режим: кожен рядок - команда з аргументами, наприклад 'add phone "John Smith" +380501234567'.
+    # Аргументи підставляються замість відповідей на запитання команди у тому ж порядку. Порожні рядки та рядки
+    # з '#' пропускаються, 'exit' завершує скрипт. Усі зміни пишуться однією групою і зберігаються один раз у кінці.
+    # Повертає кількість рядків, які не вдалося виконати.
+    declare_view_format(view_format)
+    console = get_console(view_format)
+    contact_book.load_from_file(filename)
+    failed = 0
+    with contact_book.storage.bulk():
+        for number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                words = shlex.split(line)
+            except ValueError as e:
+                print(f'Line {number}: {e}')
+                failed += 1
+                continue
+            cmd, args = COMMANDS.match_words(words)
+            if cmd is exit_command:
+                break
+            if cmd is None:
+                print(f'Line {number}: {unknown_command(args)}')
+                failed += 1
+                continue
+            set_answers(args)
+            try:
+                result = cmd(args)
+            except Exception as e:  # помилка в одному рядку не зупиняє весь скрипт
+                result = e
+            finally:
+                set_answers(None)
+            if isinstance(result, Exception):
+                print(f'Line {number}: {result}')
+                failed += 1
+            else:
+                show_result(result, view_format, console, paged=False)
+    contact_book.save_to_file(filename)
+    return failed
+
+
 def main(view_format):
     start()
+    console = get_console(view_format)
     while True:
-        example_table = Table()
-        console = Console()
         
         user_input = input("\nTo see the list of available commands, type 'help' or '00'\nEnter your command and args (separated by 'space bar'): ")
         
         cmd, data = parse_input(user_input, view_format)
         
         result = cmd(data)
-        if view_format == 1:
-            print(result)
-        else:
-            if type(result) == type(example_table):
-                console.print(result)
-            else:
-                print(result)
+        show_result(result, view_format, console)
         # Вихід з бота пропоную роботи не через Enter, бо це може бути випадково зроблене. А лише якщо користувач введе команду на вихід
         if cmd == exit_command:  
             break
@@ -0,0 +1,94 @@
+import io
+import json
+import time
+
+
+def percentile(values: list, share: float) -> float:
+    # Перцентиль методом найближчого рангу; values вже відсортовані.
+    if not values:
+        return 0.0
+    rank = max(int(share * len(values) + 0.999999) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class CommandStats:
+    """Call count, time and failures of every contact book command"""
+
+    # Час команди не включає час, протягом якого програма чекала на введення користувача: ask() додає його
+    # до prompt_seconds, а finish() віднімає різницю за час виконання команди. Вкладені команди (наприклад,
+    # data_input всередині add phone) рахуються як частина зовнішньої, тому враховується лише верхній рівень.
+
+    def __init__(self):
+        self.prompt_seconds = 0.0
+        self.depth = 0
+        self.commands = {}
+
+    def reset(self):
+        self.commands = {}
+
+    def start(self):
+        self.depth += 1
+        return time.perf_counter(), self.prompt_seconds
+
+    def finish(self, name: str, started, error: BaseException = None):
+        self.depth -= 1
+        if self.depth:
+            return
+        started_at, prompt_before = started
+        seconds = time.perf_counter() - started_at - (self.prompt_seconds - prompt_before)
+        command = self.commands.setdefault(name, {'calls': 0, 'failures': {}, 'durations': []})
+        command['calls'] += 1
+        command['durations'].append(seconds)
+        if error is not None:
+            kind = type(error).__name__
+            command['failures'][kind] = command['failures'].get(kind, 0) + 1
+
+    def summary(self) -> dict:
+        result = {}
+        for name, command in self.commands.items():
+            durations = sorted(command['durations'])
+            result[name] = {
+                'calls': command['calls'],
+                'failures': dict(command['failures']),
+                'total_seconds': sum(durations),
+                'p50': percentile(durations, 0.5),
+                'p90': percentile(durations, 0.9),
+                'p99': percentile(durations, 0.99),
+                'max': durations[-1] if durations else 0.0,
+            }
+        return result
+
+    def report(self) -> str:
+        summary = self.summary()
+        if not summary:
+            return 'No commands have been run yet'
+        lines = [f"{'command':<32}{'calls':>7}{'failed':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name, row in sorted(summary.items(), key=lambda item: -item[1]['total_seconds']):
+            lines.append(
+                f"{name:<32}{row['calls']:>7}{sum(row['failures'].values()):>8}"
+                f"{row['p50'] * 1000:>10.2f}{row['p90'] * 1000:>10.2f}{row['p99'] * 1000:>10.2f}{row['max'] * 1000:>10.2f}"
+            )
+        return '\n'.join(lines)
+
+    def dump(self, path: str):
+        # Зведення разом з усіма виміряними часами, щоб їх можна було проаналізувати окремо.
+        data = self.summary()
+        for name, row in data.items():
+            row['durations'] = self.commands[name]['durations']
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, indent=2)
+
+
+def profile_call(func, *args, limit: int = 20):
+    # Виконує func під cProfile. Повертає (результат, текстовий звіт про limit найдорожчих за сумарним часом функцій).
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args)
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(limit)
+    return result, report.getvalue()
+
+
+STATS = CommandStats()
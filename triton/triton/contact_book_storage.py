@@ -0,0 +1,364 @@
+from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from datetime import date
+import os
+import pickle  # модуль для зберігання та читання інформації.
+import sqlite3
+
+from termcolor import colored
+
+from contact_book_classes import Record, Name, Phone, Birthday, Email, Country, City, Street, House
+
+
+class Storage(ABC):
+    """Backend that keeps AddressBook.data on disk"""
+
+    @abstractmethod
+    def load(self, book):
+        # Повертає відображення 'ім'я -> Record', яке стане book.data.
+        pass
+
+    @abstractmethod
+    def put(self, name: str, record: Record):
+        pass
+
+    @abstractmethod
+    def delete(self, name: str):
+        pass
+
+    @abstractmethod
+    def save(self, data):
+        pass
+
+    @contextmanager
+    def bulk(self):
+        # Групує багато змін в одну операцію запису. За замовчуванням нічого не робить.
+        yield self
+
+    def birthdays(self):
+        # Пари (ім'я, дата народження у форматі ISO), відсортовані за ім'ям, без створення записів.
+        # None - сховище не вміє цього швидше, ніж обхід самих записів.
+        return None
+
+    def close(self):
+        # Звільняє файли сховища перед повторним завантаженням книги. Усі зміни на цей момент уже записані.
+        pass
+
+
+class PickleStorage(Storage):
+    """Pickle snapshot plus append-only journal"""
+
+    # Кожна зміна книги дописується у журнал '<filename>.journal' одним компактним записом:
+    # ('put', name, record) або ('del', name). Після compact_every записів журнал згортається у новий знімок.
+    journal_suffix = '.journal'
+    compact_every = 1000
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.journal = filename + self.journal_suffix
+        self.journal_size = 0
+        self.journal_file = None  # відкритий журнал під час bulk()
+        self.data = {}
+
+    def read(self):
+        # Читає знімок і журнал у self.data, нічого не записуючи у файли. Повертає True, якщо журнал прочитано повністю.
+        # Якщо знімка немає або він пошкоджений, виняток передається далі.
+        self.journal_size = 0
+        with open(self.filename, 'rb') as f:
+            self.data = pickle.load(f)
+        return self._replay_journal()
+
+    def load(self, book):
+        try:
+            journal_is_complete = self.read()
+        except (FileNotFoundError, pickle.UnpicklingError):
+            with open(self.filename, 'wb') as f:
+                self.data = {}
+                pickle.dump(self.data, f)
+            journal_is_complete = self._replay_journal()
+        for record in self.data.values():
+            record._book = book
+        if not journal_is_complete:
+            self.compact()
+        return self.data
+
+    def _replay_journal(self):
+        # Повертає True, якщо журнал прочитано повністю, і False, якщо його хвіст пошкоджений (наприклад, після збою).
+        if not os.path.exists(self.journal):
+            return True
+        size = os.path.getsize(self.journal)
+        with open(self.journal, 'rb') as file:
+            while file.tell() < size:
+                try:
+                    entry = pickle.load(file)
+                except Exception:  # недописаний запис може зламати pickle будь-яким винятком
+                    return False
+                if entry[0] == 'put':
+                    self.data[entry[1]] = entry[2]
+                elif entry[0] == 'del':
+                    self.data.pop(entry[1], None)
+                self.journal_size += 1
+        return True
+
+    def _append(self, *entry):
+        if self.journal_file is not None:
+            pickle.dump(entry, self.journal_file)
+            self.journal_size += 1
+            return
+        with open(self.journal, 'ab') as file:
+            pickle.dump(entry, file)
+        self.journal_size += 1
+        if self.journal_size >= self.compact_every:
+            self.compact()
+
+    @contextmanager
+    def bulk(self):
+        # Журнал відкривається один раз на всю групу змін, а згортання відкладається до її завершення.
+        if self.journal_file is not None:
+            yield self
+            return
+        self.journal_file = open(self.journal, 'ab')
+        try:
+            yield self
+        finally:
+            self.journal_file.close()
+            self.journal_file = None
+        if self.journal_size >= self.compact_every:
+            self.compact()
+
+    def put(self, name, record):
+        self._append('put', name, record)
+
+    def delete(self, name):
+        self._append('del', name)
+
+    def compact(self):
+        # Згортає журнал у новий знімок. Знімок спочатку пишеться у тимчасовий файл, тому збій не зіпсує попередній.
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, mode="wb") as file:
+            pickle.dump(dict(self.data), file)
+        os.replace(temp_filename, self.filename)
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+        self.journal_size = 0
+
+    def save(self, data):
+        self.data = data
+        self.compact()
+
+
+class SQLiteRecords(MutableMapping):
+    """Lazy 'name -> Record' mapping over SQLiteStorage"""
+
+    # Записи читаються з бази лише під час першого звернення до них і далі зберігаються у self.cache.
+    # Усі зміни в базу пише AddressBook через SQLiteStorage.put/delete, тому тут змінюється лише кеш.
+
+    def __init__(self, storage, book):
+        self.storage = storage
+        self.book = book
+        self.cache = {}
+
+    def __getitem__(self, name):
+        record = self.cache.get(name)
+        if record is None:
+            record = self.storage.read(name)
+            if record is None:
+                raise KeyError(name)
+            record._book = self.book
+            self.cache[name] = record
+        return record
+
+    def __contains__(self, name):
+        return name in self.cache or self.storage.exists(name)
+
+    def __setitem__(self, name, record):
+        self.cache[name] = record
+
+    def __delitem__(self, name):
+        self.cache.pop(name, None)
+
+    def __iter__(self):
+        return self.storage.names()
+
+    def __len__(self):
+        return self.storage.count()
+
+
+class SQLiteStorage(Storage):
+    """SQLite database with one row per contact and a normalized phones table"""
+
+    schema = '''
+        CREATE TABLE IF NOT EXISTS records (
+            name TEXT PRIMARY KEY,
+            birthday TEXT,
+            email TEXT,
+            country TEXT,
+            city TEXT,
+            street TEXT,
+            house TEXT
+        );
+        CREATE TABLE IF NOT EXISTS phones (
+            name TEXT NOT NULL REFERENCES records(name) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            phone TEXT NOT NULL,
+            PRIMARY KEY (name, position)
+        );
+        CREATE INDEX IF NOT EXISTS phones_by_phone ON phones(phone);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    '''
+
+    def __init__(self, filename, legacy_filename=None):
+        self.filename = filename
+        self.legacy_filename = legacy_filename
+        self.connection = None
+        self.in_bulk = False
+
+    def connect(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.filename)
+            self.connection.execute('PRAGMA foreign_keys = ON')
+            self.connection.executescript(self.schema)
+        return self.connection
+
+    def load(self, book):
+        self.connect()
+        records = SQLiteRecords(self, book)
+        self.import_legacy()
+        return records
+
+    def import_legacy(self):
+        # Старий формат (pickle-знімок з журналом) імпортується один раз, під час першого запуску з базою.
+        if not self.legacy_filename or not os.path.exists(self.legacy_filename):
+            return
+        if self.connection.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+            return
+        # Старий файл лише читається: якщо його не вдалося прочитати, він залишається як є, і імпорт повториться
+        # під час наступного запуску.
+        legacy = PickleStorage(self.legacy_filename)
+        try:
+            journal_is_complete = legacy.read()
+        except Exception as e:  # пошкоджений pickle може зламатися будь-яким винятком
+            print(colored(f"Old contact book '{self.legacy_filename}' can't be read and was not imported: {e}", "red"))
+            return
+        if not journal_is_complete:
+            print(colored(f"The end of '{legacy.journal}' is damaged: only the changes before it are imported", "yellow"))
+        with self.bulk():
+            for name, record in legacy.data.items():
+                self.put(name, record)
+            self.connection.execute(
+                "INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)", (self.legacy_filename,)
+            )
+
+    @staticmethod
+    def _value(field):
+        return field.value if field is not None else None
+
+    def put(self, name, record):
+        birthday = record.birthday.value.isoformat() if record.birthday is not None else None
+        self.connection.execute(
+            '''INSERT INTO records (name, birthday, email, country, city, street, house)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(name) DO UPDATE SET
+                   birthday = excluded.birthday, email = excluded.email, country = excluded.country,
+                   city = excluded.city, street = excluded.street, house = excluded.house''',
+            (name, birthday, self._value(record.email), self._value(record.country),
+             self._value(record.city), self._value(record.street), self._value(record.house))
+        )
+        self.connection.execute('DELETE FROM phones WHERE name = ?', (name,))
+        self.connection.executemany(
+            'INSERT INTO phones (name, position, phone) VALUES (?, ?, ?)',
+            [(name, position, phone.value) for position, phone in enumerate(record.phones)]
+        )
+        self._commit()
+
+    def delete(self, name):
+        self.connection.execute('DELETE FROM records WHERE name = ?', (name,))
+        self._commit()
+
+    def read(self, name):
+        row = self.connection.execute(
+            'SELECT name, birthday, email, country, city, street, house FROM records WHERE name = ?', (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        name, birthday, email, country, city, street, house = row
+        # Дані в базі вже пройшли перевірку, тому поля відновлюються без повторної валідації.
+        record = Record(
+            Name.restore(name),
+            birthday=Birthday.restore(date.fromisoformat(birthday)) if birthday is not None else None,
+            email=Email.restore(email) if email is not None else None,
+            country=Country.restore(country) if country is not None else None,
+            city=City.restore(city) if city is not None else None,
+            street=Street.restore(street) if street is not None else None,
+            house=House.restore(house) if house is not None else None,
+        )
+        phones = self.connection.execute('SELECT phone FROM phones WHERE name = ? ORDER BY position', (name,))
+        record.phones = [Phone.restore(phone) for (phone,) in phones]
+        return record
+
+    def exists(self, name):
+        return self.connection.execute('SELECT 1 FROM records WHERE name = ?', (name,)).fetchone() is not None
+
+    def names(self, chunk_size=1000):
+        # rowid зберігає порядок додавання контактів, так само як і звичайний dict. Імена читаються частинами
+        # (keyset-пагінація за rowid), тому обхід книги не тримає в пам'яті всі імена і не ламається від змін під час обходу.
+        last_rowid = -1
+        while True:
+            rows = self.connection.execute(
+                'SELECT rowid, name FROM records WHERE rowid > ? ORDER BY rowid LIMIT ?', (last_rowid, chunk_size)
+            ).fetchall()
+            if not rows:
+                return
+            for rowid, name in rows:
+                yield name
+            last_rowid = rows[-1][0]
+
+    def count(self):
+        return self.connection.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def birthdays(self):
+        return self.connection.execute('SELECT name, birthday FROM records WHERE birthday IS NOT NULL ORDER BY name')
+
+    def _commit(self):
+        if not self.in_bulk:
+            self.connection.commit()
+
+    @contextmanager
+    def bulk(self):
+        if self.in_bulk:
+            yield self
+            return
+        self.in_bulk = True
+        try:
+            yield self
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        finally:
+            self.in_bulk = False
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def save(self, data):
+        self.connect()
+        if not isinstance(data, SQLiteRecords) or data.storage is not self:
+            with self.bulk():
+                self.connection.execute('DELETE FROM records')
+                for name, record in data.items():
+                    self.put(name, record)
+        self.connection.commit()
+
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+def storage_for(filename):
+    # Тип сховища визначається розширенням файлу. Для бази поруч шукається старий 'contact_book.bin' для імпорту.
+    if os.path.splitext(filename)[1] in SQLITE_SUFFIXES:
+        return SQLiteStorage(filename, legacy_filename=os.path.splitext(filename)[0] + '.bin')
+    return PickleStorage(filename)
@@ -0,0 +1,152 @@
+from bisect import bisect_left
+from datetime import date, datetime
+from pathlib import Path
+import re
+import sys
+
+triton_path = Path(__file__).parent.parent
+countries_txt = triton_path / 'countries.txt'
+
+# Регулярні вирази компілюються один раз під час імпорту модуля, а не шукаються у кеші re на кожну перевірку.
+NAME_PATTERN = re.compile(r'[A-z\d _\.\(\)\/\\\,]{1,20}')
+PHONE_PATTERN = re.compile(r'^\+380\d{9}$')
+EMAIL_PATTERN = re.compile(r'[A-Za-z]{1}[\w.]+@[a-zA-Z0-9]+\.[a-zA-Z]{2,}\b')
+CITY_PATTERN = re.compile(r'^[A-z]{2,25}$')
+STREET_PATTERN = re.compile(r'^[A-z\d\.\-\(\)\:\_\,\/ ]{2,25}$')
+HOUSE_PATTERN = re.compile(r'[ A-z\d\-\\\/\.]{1,15}')
+
+
+class ValidationError(ValueError):
+    """Value of a contact field that did not pass the check"""
+
+    def __init__(self, field: str, value, message: str):
+        super().__init__(message)
+        self.field = field
+        self.value = value
+        self.message = message
+
+
+def validate_name(value: str) -> str:
+    if not NAME_PATTERN.match(value):
+        raise ValidationError('name', value, 'Wrong format.')
+    return value
+
+
+def validate_phone(value: str) -> str:
+    if not PHONE_PATTERN.match(value):
+        raise ValidationError('phone', value, 'Wrong format. Phone number should be in the format +380XXXXXXXXX.')
+    return value
+
+
+def parse_date(value: str) -> date:
+    # Швидкий шлях для звичайного 'dd.mm.YYYY' без datetime.strptime. Інші записи (наприклад, '1.2.1990') розбирає strptime.
+    if len(value) == 10 and value[2] == '.' and value[5] == '.':
+        day, month, year = value[0:2], value[3:5], value[6:10]
+        if day.isdigit() and month.isdigit() and year.isdigit():
+            return date(int(year), int(month), int(day))
+    return datetime.strptime(value, '%d.%m.%Y').date()
+
+
+def validate_birthday(value: str, today: date = None) -> date:
+    try:
+        birthday = parse_date(value)
+    except ValueError:
+        raise ValidationError(
+            'birthday', value, 'Wrong format. Enter birthday in format dd.mm.YYYY. Days in range(31), month in range(12)'
+        )
+    if birthday >= (today or datetime.now().date()):
+        raise ValidationError('birthday', value, 'The user has not been born yet.')
+    return birthday
+
+
+def validate_email(value: str) -> str:
+    if not EMAIL_PATTERN.match(value):
+        raise ValidationError('email', value, 'Wrong format. Email should be in the format xxxxxx@xxx.xx')
+    return value
+
+
+# Список країн читається з countries.txt один раз, під час першої перевірки, і зберігається як словник
+# 'назва у нижньому регістрі -> назва з великих літер'. Відсортовані ключі потрібні для пошуку за префіксом.
+_countries_index = None
+_countries_sorted = None
+
+
+def countries_index() -> dict:
+    global _countries_index, _countries_sorted
+    if _countries_index is None:
+        index = {}
+        with open(countries_txt, 'r') as fh:
+            for line in fh:
+                country = line.lower().strip()
+                if country:
+                    index[country] = sys.intern(' '.join(i.capitalize() for i in country.split(' ')))
+        _countries_sorted = sorted(index)
+        _countries_index = index
+    return _countries_index
+
+
+def country_completions(prefix: str, limit: int = 5) -> list:
+    # Повертає до limit країн, назви яких починаються з prefix (без урахування регістру).
+    index = countries_index()
+    prefix = prefix.lower().strip()
+    if not prefix:
+        return []
+    result = []
+    for country in _countries_sorted[bisect_left(_countries_sorted, prefix):]:
+        if not country.startswith(prefix) or len(result) >= limit:
+            break
+        result.append(index[country])
+    return result
+
+
+def validate_country(value: str) -> str:
+    if value.lower() == 'russia':
+        return 'a terrorist country'
+    country = countries_index().get(value.lower())  # рядки з індексу вже спільні для всіх записів
+    if country is None:
+        raise ValidationError('country', value, 'There is no such country.')
+    return country
+
+
+def validate_city(value: str) -> str:
+    if not CITY_PATTERN.match(value):
+        raise ValidationError('city', value, 'Wrong format. City should contain only 2-25 letters.')
+    return value
+
+
+def validate_street(value: str) -> str:
+    if not STREET_PATTERN.match(value):
+        raise ValidationError('street', value, 'Wrong format. Street should contain 2-25 letters, digits or punctuation.')
+    return value
+
+
+def validate_house(value: str) -> str:
+    if not HOUSE_PATTERN.match(value):
+        raise ValidationError('house', value, 'Wrong format. House should contain letters or digits.')
+    return value
+
+
+VALIDATORS = {
+    'name': validate_name,
+    'phone': validate_phone,
+    'birthday': validate_birthday,
+    'email': validate_email,
+    'country': validate_country,
+    'city': validate_city,
+    'street': validate_street,
+    'house': validate_house,
+}
+
+
+def validate_many(field: str, values) -> list:
+    # Перевіряє багато значень одного поля (для імпорту та завантаження). Нічого не друкує і не викидає винятків:
+    # повертає список пар (перевірене значення, None) або (None, ValidationError) у порядку values.
+    validator = VALIDATORS[field]
+    extra = {'today': datetime.now().date()} if field == 'birthday' else {}
+    result = []
+    for value in values:
+        try:
+            result.append((validator(value, **extra), None))
+        except ValidationError as error:
+            result.append((None, error))
+    return result
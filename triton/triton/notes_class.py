@@ -1,5 +1,7 @@
-import json
 from collections import UserDict
+import os
+
+from notes_index import NoteTextIndex, TagRegistry, tokenize
 
 
 class Field:
@@ -39,7 +41,21 @@ class Note:
         if tag:
             self.tags.append(tag)
         self.status = True
+        self.notebook = None  # блокнот, у який додано нотатку: його реєстр тегів оновлюється разом з тегами нотатки
+
+    # Вміст нотатки, завантаженої з файлу, не тримається в пам'яті: content_source = (сховище, offset, length),
+    # і вміст читається з диска під час кожного звернення. Новий вміст, присвоєний нотатці, зберігається як звичайно.
+    @property
+    def content(self):
+        if self._content is None and self.content_source is not None:
+            storage, offset, length = self.content_source
+            return Field(storage.read_content(offset, length))
+        return self._content
 
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self.content_source = None
 
     def __str__(self):
         if self.tags is None:
@@ -50,11 +66,14 @@ class Note:
     def add_tag_in_tags(self, tag):
         if tag not in self.tags:
             self.tags.append(tag)
+            if self.notebook is not None:
+                self.notebook.tags.attach(tag.value, self.name.value)
+                self.notebook.note_changed(self)
         else:
             print(f"Tag {tag} already exists")
     
     def delete_tag_from_note(self, note, tag):
-        note.tags.remove(tag)
+        note.remove_tag(tag)
         print(f"Tag {tag} deleted from note {note.name}")
     
     def remove_tag(self, tag):
@@ -62,6 +81,11 @@ class Note:
             self.tags.remove(tag)
         except ValueError:
             print('There is no such tag in this note\n')
+            return
+        if self.notebook is not None:
+            if tag not in self.tags:
+                self.notebook.tags.detach(tag.value, self.name.value)
+            self.notebook.note_changed(self)
     
     def get_tag_values(self):
         return self.tags_list
@@ -70,12 +94,94 @@ class Note:
         return note.tags
 
 
+class NotePages:
+    """Pages of a fixed ordering of notes with random access and a cursor"""
+
+    # Порядок нотаток фіксується один раз (копіюється лише список посилань), тому сторінка K - це зріз
+    # notes[(K - 1) * size:K * size], і для неї форматуються лише її нотатки, а не всі попередні. Курсор current
+    # зберігає номер показаної сторінки, тож можна йти вперед, назад або одразу на будь-яку сторінку.
+
+    def __init__(self, notes, size: int):
+        self.notes = notes if isinstance(notes, list) else list(notes)
+        self.size = size
+        self.current = 0  # 0 - ще жодна сторінка не показана
+
+    def __len__(self):
+        return -(-len(self.notes) // self.size)
+
+    def page(self, number: int) -> str:
+        # Текст сторінки number (від 1), кожна нотатка з нового рядка.
+        if not 1 <= number <= len(self):
+            raise IndexError(f'There is no page {number}.')
+        start = (number - 1) * self.size
+        return ''.join([f'{note}\n' for note in self.notes[start:start + self.size]])
+
+    def go(self, number: int):
+        # Переводить курсор на сторінку number і повертає її текст або None, якщо такої сторінки немає.
+        if not 1 <= number <= len(self):
+            return None
+        self.current = number
+        return self.page(number)
+
+    def next(self):
+        return self.go(self.current + 1)
+
+    def previous(self):
+        return self.go(self.current - 1)
+
+
 class Notebook(UserDict):
 
+    # Назви та вміст нотаток шукаються через повнотекстові індекси. Індекс поля будується під час першого пошуку
+    # (завантаження блокнота від цього не сповільнюється), а далі оновлюється під час додавання, зміни та видалення
+    # нотаток. Теги зберігаються в реєстрі TagRegistry (тег -> назви нотаток), який нотатки оновлюють самі, коли
+    # додають або прибирають тег. Статус і далі перевіряється по всіх нотатках.
+    # Після load_json кожна зміна одразу дописується у журнал сховища notes_storage.NotebookStorage.
+    text_fields = ('name', 'content')
+
     def __init__(self):
         self.data = {}
-        self.tags_list = []
+        self.tags = TagRegistry()
+        self.text_indexes = {}
+        self.storage = None
+
+    @property
+    def tags_list(self) -> list:
+        # Список тегів блокнота у попередньому форматі (як у notebook.json).
+        return list(self.tags)
+
+    @tags_list.setter
+    def tags_list(self, tags):
+        self.tags.replace(tags)
+        if self.storage is not None:
+            self.storage.set_tags(self.tags_list)
+
+    @staticmethod
+    def note_row(note) -> dict:
+        # Нотатка з усім вмістом, як у notebook.json попередніх версій.
+        return {
+            "name": note.name.value,
+            "content": note.content.value,
+            "tags": [tag.value for tag in note.tags],
+            "status": note.status
+        }
+
+    def _storage_row(self, note) -> dict:
+        # Якщо вміст не змінювався після завантаження, у журнал пишеться лише його місце у файлі вмісту.
+        if note.content_source is None or note.content_source[0] is not self.storage:
+            return self.note_row(note)
+        _, offset, length = note.content_source
+        return {"name": note.name.value, "tags": [tag.value for tag in note.tags], "status": note.status,
+                "offset": offset, "length": length}
+
+    def note_changed(self, note):
+        if self.storage is not None and self.data.get(note.name.value) is note:
+            self.storage.put(self._storage_row(note))
     
+    def values(self):
+        # Представлення self.data напряму: UserDict.values() читає кожну нотатку через __getitem__.
+        return self.data.values()
+
     def __str__(self):
         return "\n".join(str(note) for note in self.data.values())
 
@@ -83,10 +189,55 @@ class Notebook(UserDict):
         return str(self)
     
     def add_note(self, note):
-        self.data[note.name.value] = note
+        self._insert(note)
+        self.note_changed(note)
         return f"Note '{note}' added successfully."
+
+    def _insert(self, note):
+        previous = self.data.get(note.name.value)
+        if previous is not None and previous is not note:
+            self._unindex(previous)
+        self.data[note.name.value] = note
+        self._index(note)
+
+    def notes_with_tag(self, tag: str) -> list:
+        return [self.data[name] for name in sorted(self.tags.with_tag(tag))]
+
+    def notes_with_tags(self, *tags: str) -> list:
+        # Нотатки, у яких є всі задані теги, відсортовані за назвою.
+        return [self.data[name] for name in sorted(self.tags.with_all(tags))]
+
+    def text_index(self, field):
+        index = self.text_indexes.get(field)
+        if index is None:
+            index = self.text_indexes[field] = NoteTextIndex(field).build(self.data.values())
+        return index
+
+    def _index(self, note):
+        note.notebook = self
+        for tag in note.tags:
+            self.tags.attach(tag.value, note.name.value)
+        for index in self.text_indexes.values():
+            index.update(note)
+
+    def _unindex(self, note):
+        for tag in note.tags:
+            self.tags.detach(tag.value, note.name.value)
+        note.notebook = None
+        for index in self.text_indexes.values():
+            index.discard(note)
     
     def search_in_notes(self, field, search: str):
+        # Для назви та вмісту - нотатки з усіма словами запиту (слово може бути початком слова нотатки), від
+        # найрелевантнішої. Запит без жодного слова (наприклад, '' або '?') перевіряється входженням рядка.
+        if field in self.text_fields and isinstance(search, str) and tokenize(search):
+            return self.text_index(field).search(search)
+        if field == 'tags' and search:
+            # Нотатки з тегами, що містять запит: об'єднання множин реєстру замість перегляду всіх нотаток.
+            names = set()
+            for tag in self.tags.search(str(search)):
+                names |= self.tags.notes[tag]
+            return [self.data[name] for name in sorted(names)]
         result = []
         for note in self.data.values():
             if str(search).lower() in str(getattr(note, field)).lower():
@@ -95,10 +246,29 @@ class Notebook(UserDict):
     
     def delete_in_note(self, note):
         del self.data[note.name.value]
+        self._unindex(note)
+        if self.storage is not None:
+            self.storage.delete(note.name.value)
         print("Record deleted")
     
     def edit_in_note(self, note, field, new_value):
+        if field == 'name' and new_value.value != note.name.value:
+            # Нотатки зберігаються за назвою, тому перейменована нотатка переходить під новий ключ разом зі своїми тегами.
+            # Нотатка з такою самою назвою замінюється, як і в add_note.
+            old = note.name.value
+            previous = self.data.get(new_value.value)
+            if previous is not None:
+                self._unindex(previous)
+            del self.data[old]
+            self.data[new_value.value] = note
+            self.tags.rename([tag.value for tag in note.tags], old, new_value.value)
+            if self.storage is not None:
+                self.storage.rename(old, new_value.value)
         setattr(note, field, new_value)
+        index = self.text_indexes.get(field)
+        if index is not None:
+            index.update(note)
+        self.note_changed(note)
         print(f"Note updated: {note}")
 
     def edit_status_in_note(self, note):
@@ -107,6 +277,7 @@ class Notebook(UserDict):
         else:
             status = True
         setattr(note, "status", status) 
+        self.note_changed(note)
         print(f"Note status updated: {note}")
 
     def sort_by_tags(self):
@@ -115,74 +286,66 @@ class Notebook(UserDict):
         return notes
     
     def add_tag_note(self, new_tag):
-        if new_tag.value not in self.tags_list:
-            self.tags_list.append(new_tag.value)
+        if self.tags.register(new_tag.value):
+            if self.storage is not None:
+                self.storage.add_tag(new_tag.value)
             print(f"Tag {new_tag.value} added")
         else:
             print(f"Tag {new_tag.value} already exists")
     
     def delete_tag_from_note(self, note, tag):
         if tag in note.tags:
-            note.tags.remove(tag)
+            note.remove_tag(tag)
             print(f"Tag {tag} deleted from note {note.name}")
         else:
             print(f"Tag {tag} not found in note {note.name}")
     
     def search_in_tags(self, search):
-        tags = []
-        for tag in self.tags_list:
-            if search.lower() in tag.lower():
-                tags.append(tag)
-        return tags
+        return self.tags.search(search)
     
     def get_tag_values(self):
         return self.tags_list
 
+    def pages(self, et_list, n) -> NotePages:
+        # Підходить і для self.values(), і для результату sort_by_tags.
+        return NotePages(et_list, n)
+
     def iterator(self, et_list, n):
-        count = 0
-        page = ""
-        for note in et_list:
-            page += (str(note)) + "\n"
-            count += 1
-            if count >= n:
-                yield page
-                count = 0
-                page = ""
-        if page:
-            yield page
+        pages = self.pages(et_list, n)
+        for number in range(1, len(pages) + 1):
+            yield pages.page(number)
         
     def save_json(self, file_path):
-        json_data = {
-            "tags": self.tags_list,
-            "notes": []
-        }
-
-        for note in self.data.values():
-            json_note = {
-                "name": note.name.value,
-                "content": note.content.value,
-                "tags": [tag.value for tag in note.tags],
-                "status": note.status
-            }
-            json_data["notes"].append(json_note)
-
-        with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(json_data, file, indent=2, ensure_ascii=False)
+        # Якщо блокнот завантажено з цього ж файлу, усі зміни вже записані в журнал, тож повний запис не потрібен.
+        from notes_storage import NotebookStorage
+        if self.storage is not None and os.path.abspath(file_path) == os.path.abspath(self.storage.filename):
+            self.storage.close()
+            return
+        NotebookStorage(file_path).save(self.tags_list, {name: self.note_row(note) for name, note in self.data.items()})
 
     def load_json(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                for record in data["notes"]:
-                    name = Field(record["name"])
-                    content = Field(record["content"])
-                    tags = [Tag(tag) for tag in record["tags"]]
-                    note = Note(name, content)
-                    for tag in tags:
-                        note.add_tag_in_tags(tag)
-                    self.data[name.value] = note
-                self.tags_list = data["tags"]
-        except (FileNotFoundError):
+        # Читає індекс (або notebook.json попередніх версій) разом з журналом змін і надалі пише зміни в журнал.
+        # Вміст нотаток залишається на диску, доки його не покажуть, не змінять або не шукатимуть.
+        from notes_storage import NotebookStorage
+        if self.storage is not None and os.path.abspath(file_path) == os.path.abspath(self.storage.filename):
+            return  # блокнот уже працює з цим файлом (наприклад, повторний вхід у меню), усі зміни вже записані
+        storage = NotebookStorage(file_path)
+        state = storage.load()
+        if state is None:
             print(f"\nThe file {file_path} is missing or does not contain valid JSON data.")
-            Notebook.save_json(self, file_path)
-            print("Notebook.json file is created")
\ No newline at end of file
+            storage.save(self.tags_list, {name: self.note_row(note) for name, note in self.data.items()})
+            print("Notebook.json file is created")
+            self.storage = storage
+            return
+        tags, notes = state
+        self.tags_list = tags
+        for record in notes.values():
+            note = Note(Field(record["name"]), None)
+            if "content" in record:
+                note.content = Field(record["content"])
+            else:
+                note.content_source = (storage, record["offset"], record["length"])
+            note.tags = [Tag(tag) for tag in record["tags"]]  # у файлі теги нотатки вже без повторів
+            note.status = record.get("status", True)
+            self._insert(note)  # без повідомлення add_note, яке довелося б будувати з вмісту нотатки
+        self.storage = storage
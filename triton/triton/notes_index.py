@@ -0,0 +1,194 @@
+from bisect import bisect_left, insort
+from collections import Counter
+import math
+import re
+
+token_pattern = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> list:
+    # Слова тексту в нижньому регістрі: 'Buy milk, bread!' -> ['buy', 'milk', 'bread']. Працює і для кирилиці.
+    return token_pattern.findall(str(text).casefold())
+
+
+class NoteTextIndex:
+    """Inverted index from words of one note field to notes, ranked with BM25"""
+
+    # Для кожного слова зберігається, у яких нотатках і скільки разів воно зустрічається, тому пошук читає лише
+    # списки слів запиту, а не текст усіх нотаток. Кожне слово запиту - це префікс: 'pyth' знаходить 'python' та 'pythonic'.
+    # Знайдено нотатки, у яких є всі слова запиту; вони впорядковані за BM25 (частіше і рідкісніше слово - вище),
+    # а нотатки з однаковою оцінкою - у порядку додавання. Нотатки - ключі індексу, тому перейменування їм не заважає.
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, field: str):
+        self.field = field
+        self.postings = {}  # слово -> {нотатка: кількість входжень}
+        self.counts = {}  # нотатка -> Counter її слів, щоб прибрати нотатку з індексу без повторного розбору тексту
+        self.lengths = {}  # нотатка -> кількість слів
+        self.positions = {}  # нотатка -> порядковий номер для впорядкування нотаток з однаковою оцінкою
+        self.total_length = 0
+        self._terms = None  # відсортовані слова для пошуку за префіксом, будуються під час першого пошуку
+        self._next_position = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def text(self, note) -> str:
+        value = getattr(note, self.field)
+        return value.value if hasattr(value, 'value') else value
+
+    def build(self, notes):
+        for note in notes:
+            self.add(note)
+        return self
+
+    def add(self, note, position: int = None):
+        if note in self.counts:
+            self.discard(note)
+        if position is None:
+            position = self._next_position
+            self._next_position += 1
+        words = tokenize(self.text(note))
+        counts = self.counts[note] = Counter(words)
+        self.lengths[note] = len(words)
+        self.positions[note] = position
+        self.total_length += len(words)
+        for term, count in counts.items():
+            notes = self.postings.get(term)
+            if notes is None:
+                notes = self.postings[term] = {}
+                if self._terms is not None:
+                    insort(self._terms, term)
+            notes[note] = count
+
+    def discard(self, note):
+        if note not in self.counts:
+            return
+        counts = self.counts.pop(note)
+        self.total_length -= self.lengths.pop(note)
+        del self.positions[note]
+        for term in counts:
+            notes = self.postings[term]
+            del notes[note]
+            if not notes:
+                del self.postings[term]
+                if self._terms is not None:
+                    del self._terms[bisect_left(self._terms, term)]
+
+    def update(self, note):
+        # Після зміни поля нотатка переіндексується, але зберігає своє місце серед нотаток з однаковою оцінкою.
+        self.add(note, self.positions.get(note))
+
+    def expand(self, prefix: str) -> list:
+        # Усі слова індексу, що починаються з prefix.
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        terms = []
+        for i in range(bisect_left(self._terms, prefix), len(self._terms)):
+            if not self._terms[i].startswith(prefix):
+                break
+            terms.append(self._terms[i])
+        return terms
+
+    def search(self, query: str) -> list:
+        # Нотатки, що містять усі слова запиту (як префікси), від найрелевантнішої.
+        prefixes = set(tokenize(query))
+        if not prefixes or not self.counts:
+            return []
+        k1, lengths, total = self.k1, self.lengths, len(self.counts)
+        base = k1 * (1 - self.b)
+        scale = k1 * self.b * total / self.total_length if self.total_length else 0.0
+        scores = None
+        # Починаємо з префікса з найменшою кількістю нотаток: далі перевіряються лише нотатки, що вже знайдені.
+        expanded = sorted((self.expand(prefix) for prefix in prefixes),
+                          key=lambda terms: sum(len(self.postings[term]) for term in terms))
+        for terms in expanded:
+            best = {}
+            for term in terms:
+                notes = self.postings[term]
+                weight = math.log(1 + (total - len(notes) + 0.5) / (len(notes) + 0.5)) * (k1 + 1)
+                if scores is not None and len(scores) < len(notes):
+                    notes = {note: notes[note] for note in scores if note in notes}
+                for note, count in notes.items():
+                    score = weight * count / (count + base + scale * lengths[note])
+                    if score > best.get(note, 0.0):
+                        best[note] = score  # з кількох слів для одного префікса враховується найкраще
+            if scores is not None:
+                best = {note: scores[note] + score for note, score in best.items() if note in scores}
+            scores = best
+            if not scores:
+                return []
+        # Стабільне сортування: спершу за порядком додавання, потім за оцінкою.
+        result = sorted(scores, key=self.positions.__getitem__)
+        result.sort(key=scores.__getitem__, reverse=True)
+        return result
+
+
+class TagRegistry:
+    """Tags of a notebook with the names of the notes that carry them"""
+
+    # Кожен тег зберігається разом з множиною назв нотаток, у яких він є: перевірка тегу - O(1), кількість нотаток
+    # з тегом (лічильник посилань) - розмір множини, а нотатки з кількома тегами - перетин множин, починаючи з найменшої.
+    # Тег може бути зареєстрований і без нотаток (наприклад, доданий у список тегів блокнота заздалегідь).
+
+    def __init__(self, tags=()):
+        self.notes = {}  # тег -> множина назв нотаток
+        for tag in tags:
+            self.register(tag)
+
+    def __contains__(self, tag):
+        return tag in self.notes
+
+    def __iter__(self):
+        return iter(self.notes)
+
+    def __len__(self):
+        return len(self.notes)
+
+    def register(self, tag: str) -> bool:
+        # Повертає False, якщо тег уже був зареєстрований.
+        if tag in self.notes:
+            return False
+        self.notes[tag] = set()
+        return True
+
+    def attach(self, tag: str, name: str):
+        self.notes.setdefault(tag, set()).add(name)
+
+    def detach(self, tag: str, name: str):
+        if tag in self.notes:
+            self.notes[tag].discard(name)
+
+    def rename(self, tags, old: str, new: str):
+        # Назва нотатки змінилась: її теги tags тепер посилаються на нову назву.
+        for tag in tags:
+            self.detach(tag, old)
+            self.attach(tag, new)
+
+    def count(self, tag: str) -> int:
+        return len(self.notes.get(tag, ()))
+
+    def with_tag(self, tag: str) -> set:
+        return set(self.notes.get(tag, ()))
+
+    def with_all(self, tags) -> set:
+        # Назви нотаток, у яких є всі теги tags.
+        groups = sorted((self.notes.get(tag, set()) for tag in set(tags)), key=len)
+        if not groups:
+            return set()
+        return groups[0].intersection(*groups[1:])
+
+    def search(self, text: str) -> list:
+        # Зареєстровані теги, що містять text (без урахування регістру), у порядку реєстрації.
+        text = text.lower()
+        return [tag for tag in self.notes if text in tag.lower()]
+
+    def replace(self, tags):
+        # Новий список тегів блокнота. Теги, які ще є в нотатках, залишаються зареєстрованими.
+        tags = list(tags)
+        keep = set(tags)
+        for tag in [tag for tag, names in self.notes.items() if not names and tag not in keep]:
+            del self.notes[tag]
+        for tag in tags:
+            self.register(tag)
@@ -76,8 +76,8 @@ def search_tags(note):
 
 def add_tag_in_note(tag_name, note):
     new_tag = Tag(tag_name)
-    note.add_tag_in_tags(new_tag)
     note_book.add_tag_note(new_tag)
+    note.add_tag_in_tags(new_tag)
     return edit_tag(note)
 
 def search_tag_in_tegs():
@@ -213,16 +213,25 @@ def add_note():
     print(note_book.add_note(note))
 
 def show_comand(et_list, n):
+    # Enter - наступна сторінка, 'p' - попередня, номер - перехід на сторінку, 'q' - вихід.
     if n:
-        result = ''
-        page = 1
-        for note in note_book.iterator(et_list, n):
-            result = ''
-            text = f"page {page}" 
-            result += f"{text:.^80}\n" + note
-            page += 1
-            print(result)
-            input("Next page (press Enter)")
+        pages = note_book.pages(et_list, n)
+        page = pages.next()
+        while page is not None:
+            text = f"page {pages.current} of {len(pages)}"
+            print(f"{text:.^80}\n" + page)
+            answer = input("Next page (press Enter), 'p' - previous page, page number - go to page, 'q' - stop: ").strip().lower()
+            if answer == 'q':
+                break
+            elif answer == 'p':
+                page = pages.previous() if pages.current > 1 else pages.page(1)
+            elif answer.isdigit():
+                page = pages.go(int(answer))
+                if page is None:
+                    print(colored(f"> There are only {len(pages)} pages.", "red"))
+                    page = pages.page(pages.current)
+            else:
+                page = pages.next()
     else:
         return note_book
 
@@ -0,0 +1,254 @@
+import json
+import os
+import tempfile
+import threading
+
+
+class NotebookStorage:
+    """Notebook index with note contents in a separate file, plus an append-only JSONL change log"""
+
+    # 'notebook.json' - невеликий індекс: теги блокнота і для кожної нотатки назва, теги, статус та місце її вмісту
+    # (offset і length у байтах) у файлі вмісту 'notebook.json.contents.N'. Під час запуску читається лише індекс,
+    # а вміст нотатки читається з диска тоді, коли його показують, змінюють або шукають.
+    # Кожна зміна блокнота дописується одним рядком JSON у журнал 'notebook.json.journal' і одразу скидається на диск:
+    #   {"op": "put", "note": {...}}               нотатка додана або змінена (вміст, теги, статус)
+    #   {"op": "delete", "name": ...}               нотатка видалена
+    #   {"op": "rename", "old": ..., "new": ...}    нотатка перейменована
+    #   {"op": "tag", "tag": ...} / {"op": "tags", "tags": [...]}   зміни списку тегів блокнота
+    # Нотатка в журналі містить або сам вміст ("content"), або його місце у файлі вмісту, якщо вміст не змінювався.
+    # Після compact_every записів журнал перейменовується на '.journal.old', а фоновий потік зливає індекс з ним
+    # у новий індекс; новий вміст дописується в кінець файлу вмісту. Файл вмісту під час роботи лише доповнюється,
+    # тому місця вмісту, які вже знають нотатки в пам'яті, не змінюються. Читання вмісту і згортання використовують
+    # один замок. Файл вмісту переписується повністю (у файл з наступним номером) лише під час завантаження: якщо
+    # попереднє згортання не завершилось, журнал пошкоджений, файл має старий формат або більша частина файлу вмісту -
+    # це старі версії нотаток. Старі файли notebook.json (з вмістом усередині) читаються як звичайний індекс.
+    version = 2
+    journal_suffix = '.journal'
+    rotated_suffix = '.journal.old'
+    contents_suffix = '.contents.'
+    compact_every = 1000
+    garbage_limit = 1 << 20  # байти старих версій вмісту, після яких файл вмісту переписується під час завантаження
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.folder = os.path.dirname(os.path.abspath(filename))
+        self.journal = filename + self.journal_suffix
+        self.rotated = filename + self.rotated_suffix
+        self.contents = None  # шлях до файлу вмісту
+        self.journal_size = 0
+        self.journal_file = None
+        self.reader = None  # відкритий файл вмісту для читання
+        self.lock = threading.Lock()  # файли індексу, вмісту та журналів змінюються й читаються лише під цим замком
+        self.compaction = None  # фоновий потік згортання
+
+    @staticmethod
+    def apply(state, entry):
+        # state = (теги блокнота, {назва: нотатка}); нотатки - словники у форматі індексу.
+        tags, notes = state
+        op = entry['op']
+        if op == 'put':
+            notes[entry['note']['name']] = entry['note']
+        elif op == 'delete':
+            notes.pop(entry['name'], None)
+        elif op == 'rename':
+            note = notes.pop(entry['old'], None)
+            if note is not None:
+                note['name'] = entry['new']
+                notes[entry['new']] = note
+        elif op == 'tag':
+            if entry['tag'] not in tags:
+                tags.append(entry['tag'])
+        elif op == 'tags':
+            tags[:] = entry['tags']
+
+    def read_snapshot(self):
+        # Повертає (теги, {назва: нотатка}, назва файлу вмісту або None для старого формату).
+        with open(self.filename, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        notes = {note['name']: note for note in data.get('notes', [])}
+        return list(data.get('tags', [])), notes, data.get('contents')
+
+    def replay(self, state, path) -> tuple:
+        # Застосовує журнал path до state. Повертає (кількість записів, чи прочитано журнал повністю).
+        # Журналу може не бути, зокрема якщо його щойно згорнув фоновий потік іншого сховища цього ж файлу.
+        count = 0
+        try:
+            file = open(path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return 0, True
+        with file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:  # недописаний рядок після збою
+                    return count, False
+                self.apply(state, entry)
+                count += 1
+        return count, True
+
+    def load(self):
+        # Індекс разом з журналами. Повертає (теги, {назва: нотатка}) або None, якщо файлу ще немає.
+        with self.lock:
+            if not os.path.exists(self.filename):
+                return None
+            tags, notes, contents = self.read_snapshot()
+            state = (tags, notes)
+            rotated, rotated_complete = self.replay(state, self.rotated)
+            current, current_complete = self.replay(state, self.journal)
+            self.journal_size = rotated + current
+            self._open_contents(contents)
+            unfinished = os.path.exists(self.rotated)
+        rewrite = contents is None or unfinished or not (rotated_complete and current_complete)
+        if not rewrite:
+            live = sum(note.get('length', 0) for note in notes.values())
+            rewrite = os.path.getsize(self.contents) - live > max(live, self.garbage_limit)
+        if rewrite:
+            notes = self.save(tags, notes)
+        return tags, notes
+
+    def _open_contents(self, name):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        self.contents = os.path.join(self.folder, name) if name else None
+
+    def read_content(self, offset: int, length: int) -> str:
+        with self.lock:
+            return self._read_unlocked(offset, length)
+
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self.lock:
+            if self.journal_file is None:
+                self.journal_file = open(self.journal, 'a', encoding='utf-8')
+            self.journal_file.write(line)
+            self.journal_file.flush()
+            self.journal_size += 1
+        if self.journal_size >= self.compact_every:
+            self.compact_in_background()
+
+    def put(self, note: dict):
+        self._append({'op': 'put', 'note': note})
+
+    def delete(self, name: str):
+        self._append({'op': 'delete', 'name': name})
+
+    def rename(self, old: str, new: str):
+        self._append({'op': 'rename', 'old': old, 'new': new})
+
+    def add_tag(self, tag: str):
+        self._append({'op': 'tag', 'tag': tag})
+
+    def set_tags(self, tags: list):
+        self._append({'op': 'tags', 'tags': list(tags)})
+
+    def _write_index(self, tags, notes):
+        # Індекс пишеться у тимчасовий файл і замінює попередній одним os.replace, тому збій не зіпсує старий індекс.
+        data = {'version': self.version, 'contents': os.path.basename(self.contents), 'tags': tags,
+                'notes': list(notes.values())}
+        # Тимчасовий файл у кожного запису свій, щоб два сховища одного файлу не писали в один і той самий.
+        file = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.folder,
+                                           prefix=os.path.basename(self.filename) + '.', suffix='.tmp', delete=False)
+        with file:
+            json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
+        os.replace(file.name, self.filename)
+
+    @staticmethod
+    def _store_contents(notes, file, read=None):
+        # Переносить вміст нотаток у file (відкритий на дописування) і замінює його в нотатках на offset та length.
+        # read(offset, length) читає вміст, що вже лежить в іншому файлі (для повного переписування).
+        result = {}
+        for name, note in notes.items():
+            if 'content' in note:
+                data = note['content'].encode('utf-8')
+            elif read is not None:
+                data = read(note['offset'], note['length']).encode('utf-8')
+            else:
+                result[name] = note
+                continue
+            note = {key: value for key, value in note.items() if key != 'content'}
+            note['offset'], note['length'] = file.tell(), len(data)
+            file.write(data)
+            result[name] = note
+        return result
+
+    def _close_journal(self):
+        if self.journal_file is not None:
+            self.journal_file.close()
+            self.journal_file = None
+
+    def compact_in_background(self):
+        if self.compaction is not None and self.compaction.is_alive():
+            return  # попереднє згортання ще триває; журнал згорнеться наступного разу
+        with self.lock:
+            if os.path.exists(self.rotated):
+                return
+            self._close_journal()
+            if not os.path.exists(self.journal):
+                return
+            os.replace(self.journal, self.rotated)
+            self.journal_size = 0
+        self.compaction = threading.Thread(target=self._compact_rotated, name='notebook-compaction', daemon=True)
+        self.compaction.start()
+
+    def _compact_rotated(self):
+        # Індекс і '.journal.old' змінює лише цей потік, тому вони читаються без замка. Новий вміст дописується в
+        # кінець файлу вмісту: якщо збій станеться до заміни індексу, там просто залишаться непотрібні байти.
+        tags, notes, _ = self.read_snapshot()
+        self.replay((tags, notes), self.rotated)
+        with self.lock:
+            with open(self.contents, 'ab') as file:
+                notes = self._store_contents(notes, file)
+            self._write_index(tags, notes)
+            self._remove(self.rotated)
+
+    def wait(self):
+        if self.compaction is not None:
+            self.compaction.join()
+            self.compaction = None
+
+    def close(self):
+        # Усі зміни вже в журналі: достатньо дочекатися згортання і закрити файли.
+        self.wait()
+        with self.lock:
+            self._close_journal()
+            self._open_contents(self.contents and os.path.basename(self.contents))
+
+    def _next_contents(self) -> str:
+        number = 0
+        if self.contents is not None:
+            number = int(self.contents.rsplit('.', 1)[1])
+        return os.path.basename(self.filename) + self.contents_suffix + str(number + 1)
+
+    def save(self, tags, notes: dict) -> dict:
+        # Повний запис: новий файл вмісту з наступним номером і новий індекс; журнали й старий файл вмісту видаляються.
+        # Повертає нотатки з новими місцями вмісту. Нотатки в пам'яті, що ще посилаються на старий файл вмісту,
+        # після цього читати не можна, тому для блокнота, з яким працюють, це робиться лише під час load().
+        self.wait()
+        with self.lock:
+            self._close_journal()
+            previous = self.contents
+            name = self._next_contents()
+            with open(os.path.join(self.folder, name), 'wb') as file:
+                notes = self._store_contents(notes, file, read=self._read_unlocked if previous else None)
+            self._open_contents(name)
+            self._write_index(list(tags), notes)
+            for path in (self.journal, self.rotated, previous):
+                if path:
+                    self._remove(path)
+            self.journal_size = 0
+        return notes
+
+    @staticmethod
+    def _remove(path):
+        # Файл могло вже прибрати згортання іншого сховища цього ж файлу: замок захищає лише від потоків цього сховища.
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _read_unlocked(self, offset, length):
+        if self.reader is None:
+            self.reader = open(self.contents, 'rb')
+        self.reader.seek(offset)
+        return self.reader.read(length).decode('utf-8')
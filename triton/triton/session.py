@@ -0,0 +1,129 @@
+import builtins
+from contextlib import redirect_stdout
+import io
+import json
+import time
+
+from contact_book_stats import percentile
+
+
+class SessionRecorder:
+    """Saves every answer of an interactive session to a JSONL file"""
+
+    # Усі меню TRITON читають відповіді лише через input(), тому під час запису input() підміняється обгорткою, яка
+    # дописує кожну пару (запитання, відповідь) окремим рядком JSON. Файл дописується і скидається на диск після
+    # кожної відповіді, тому навіть перерваний сеанс (Ctrl+C) можна відтворити до місця переривання.
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fh = None
+        self.original_input = None
+
+    def input(self, prompt=''):
+        answer = self.original_input(prompt)
+        self.fh.write(json.dumps({'prompt': str(prompt), 'answer': answer}, ensure_ascii=False) + '\n')
+        self.fh.flush()
+        return answer
+
+    def __enter__(self):
+        self.fh = open(self.path, 'w', encoding='utf-8')
+        self.original_input, builtins.input = builtins.input, self.input
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.input = self.original_input
+        self.fh.close()
+        return False
+
+
+class SessionReplayer:
+    """Runs an interactive loop on recorded answers with the output captured"""
+
+    # Крок - це робота програми між двома запитаннями: від відповіді до наступного виклику input(). Крок 0 - запуск
+    # до першого запитання. Затримка кроку записується разом з відповіддю, яка його спричинила, і запитанням, на якому
+    # програма зупинилась. Коли відповіді закінчуються, input() кидає EOFError, як і на кінці stdin, і відтворення
+    # завершується; сеанс вважається завершеним, лише якщо цикл вийшов сам.
+
+    def __init__(self, answers: list):
+        self.answers = answers
+        self.steps = []
+        self.output = ''
+        self.completed = False
+        self.total_seconds = 0.0
+        self._position = 0
+        self._step_started = None
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, 'r', encoding='utf-8') as fh:
+            return cls([json.loads(line)['answer'] for line in fh if line.strip()])
+
+    def _finish_step(self, prompt):
+        now = time.perf_counter()
+        answer = self.answers[self._position - 1] if self._position else None
+        self.steps.append({'answer': answer, 'prompt': prompt, 'seconds': now - self._step_started})
+        self._step_started = now
+
+    def input(self, prompt=''):
+        self._finish_step(str(prompt))
+        if self._position >= len(self.answers):
+            raise EOFError('Recorded session has no more answers.')
+        answer = self.answers[self._position]
+        self._position += 1
+        self._step_started = time.perf_counter()
+        return answer
+
+    def run(self, func, *args):
+        # Виконує func(*args), підставляючи записані відповіді замість input() і збираючи весь вивід у self.output.
+        original_input, builtins.input = builtins.input, self.input
+        buffer = io.StringIO()
+        started = self._step_started = time.perf_counter()
+        try:
+            with redirect_stdout(buffer):
+                func(*args)
+            self._finish_step(None)
+            self.completed = True
+        except EOFError:
+            pass
+        finally:
+            self.total_seconds = time.perf_counter() - started
+            builtins.input = original_input
+            self.output = buffer.getvalue()
+        return self
+
+    def summary(self) -> dict:
+        durations = sorted(step['seconds'] for step in self.steps)
+        return {
+            'answers': len(self.answers),
+            'answers_used': self._position,
+            'completed': self.completed,
+            'total_seconds': self.total_seconds,
+            'p50': percentile(durations, 0.5),
+            'p90': percentile(durations, 0.9),
+            'p99': percentile(durations, 0.99),
+            'max': durations[-1] if durations else 0.0,
+            'output_chars': len(self.output),
+        }
+
+    def report(self, slowest: int = 10) -> str:
+        summary = self.summary()
+        lines = [
+            f"answers used: {summary['answers_used']} of {summary['answers']}, "
+            f"session {'finished' if summary['completed'] else 'stopped when the answers ran out'}",
+            f"total: {summary['total_seconds'] * 1000:.2f} ms, steps: {len(self.steps)}, "
+            f"p50 {summary['p50'] * 1000:.2f} ms, p90 {summary['p90'] * 1000:.2f} ms, "
+            f"p99 {summary['p99'] * 1000:.2f} ms, max {summary['max'] * 1000:.2f} ms",
+            f"slowest steps:",
+            f"{'step':>6}{'ms':>12}  answer",
+        ]
+        ranked = sorted(enumerate(self.steps), key=lambda item: -item[1]['seconds'])[:slowest]
+        for number, step in ranked:
+            answer = '(start)' if step['answer'] is None else repr(step['answer'])
+            lines.append(f"{number:>6}{step['seconds'] * 1000:>12.2f}  {answer}")
+        return '\n'.join(lines)
+
+    def dump(self, path: str):
+        data = self.summary()
+        data['steps'] = self.steps
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, indent=2, ensure_ascii=False)
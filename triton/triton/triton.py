@@ -1,12 +1,11 @@
+import argparse
+import os
 import sys
 from pathlib import Path
 
 triton_path = Path(__file__).parent.parent
 sys.path.append(str(triton_path))
 
-from contact_book_main import main as main_contactbook
-from notes_main import main as main_notebook
-from sort_folder import main as main_sorter
 
 invitation_text = '''\nHello! I'm TRITON!!!\nI will help you organise your work!\nLet's start and enjoy!!!'''
 main_menu_text = '''\nYou're on Main Menu now.
@@ -27,7 +26,64 @@ def check_view_input(args):
         return 'stop'
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='starttriton', description='Personal assistant to manage notes, contacts and files')
+    parser.add_argument('--batch', metavar='FILE',
+                        help="run contact book commands from FILE ('-' for stdin) without questions and save once at the end")
+    parser.add_argument('--view', type=int, choices=[1, 2], default=1,
+                        help='1: results in str format, 2: results in rich table format')
+    session = parser.add_mutually_exclusive_group()
+    session.add_argument('--record', metavar='FILE', help='save every answer of this session to FILE (JSON lines)')
+    session.add_argument('--replay', metavar='FILE',
+                         help='run a session recorded with --record without questions and show the time of every step')
+    parser.add_argument('--report', metavar='FILE', help='with --replay: write the time of every step to FILE (JSON)')
+    parser.add_argument('--workdir', metavar='DIR',
+                        help='folder with contact_book.db and notebook.json (for example, a large synthetic book)')
+    return parser.parse_args(argv)
+
+
+def batch(path, view_format):
+    from contact_book_main import run_batch
+    if path == '-':
+        failed = run_batch(sys.stdin, view_format)
+    else:
+        with open(path, 'r', encoding='utf-8') as fh:
+            failed = run_batch(fh, view_format)
+    return 1 if failed else 0
+
+
+def replay(path, report_path=None):
+    from session import SessionReplayer
+    replayer = SessionReplayer.load(path).run(menu)
+    if report_path:
+        replayer.dump(report_path)
+    print(replayer.report())
+    return 0 if replayer.completed else 1
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.workdir:
+        # Шляхи до файлів сеансу задаються відносно поточної папки, а не папки з даними.
+        for option in ('batch', 'record', 'replay', 'report'):
+            path = getattr(args, option)
+            if path and path != '-':
+                setattr(args, option, os.path.abspath(path))
+        os.chdir(args.workdir)
+    if args.batch:
+        return batch(args.batch, args.view)
+    if args.replay:
+        return replay(args.replay, args.report)
+    if args.record:
+        from session import SessionRecorder
+        with SessionRecorder(args.record):
+            menu()
+        return 0
+    menu()
+    return 0
+
+
+def menu():
     print(invitation_text)
     while True:
         print(main_menu_text)
@@ -37,12 +93,16 @@ def main():
         if view_format == 'stop':
             continue
         user_input = input("\nEnter number from 1, 2 or 3 to start work with branch(press 0 to exit): ")
+        # Розділи імпортуються лише тоді, коли користувач їх обрав, тому головне меню з'являється одразу.
         if user_input == '1':
             print()
+            from contact_book_main import main as main_contactbook
             main_contactbook(view_format)
         elif user_input == '2':
+            from notes_main import main as main_notebook
             main_notebook()
         elif user_input == '3':
+            from sort_folder import main as main_sorter
             print(main_sorter())
 
         elif user_input == '0':
@@ -58,4 +118,4 @@ def main():
             
         
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file